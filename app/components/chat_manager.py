@@ -65,13 +65,30 @@ class ChatManager:
             with st.chat_message("user"):
                 st.write(prompt)
             
-            # Get AI response
-            with st.spinner("Thinking..."):
-                answer_packet = handle_user_query(
-                    user_query=prompt, 
-                    history=st.session_state.messages
-                )
+            # Get AI response, the final answer is streamed into the placeholder as it's being written
+            with st.chat_message("assistant"):
+                # Create a container for the response
+                response_container = st.container()
+                answer_placeholder = response_container.empty()
+
+                with st.spinner("Thinking..."):
+                    answer_packet = handle_user_query(
+                        user_query=prompt, 
+                        history=st.session_state.messages,
+                        on_answer_delta=answer_placeholder.write
+                    )
+                
+                # Display the complete response text
+                answer_placeholder.write(answer_packet.text)
                 
+                # Add citations tooltip if available
+                if answer_packet.citations:
+                    with response_container.expander("🔍 View Sources"):
+                        for citation in answer_packet.citations:
+                            source_type = citation.get("source", "Unknown")
+                            reference = citation.get("reference", "No reference provided")
+                            st.markdown(f"**{source_type}**: {reference}")
+
                 # Create assistant response
                 response_msg = {
                     "role": "assistant",
@@ -85,22 +102,6 @@ class ChatManager:
                 # Add to session state
                 st.session_state.messages.append(response_msg)
                 
-                # Display assistant response immediately
-                with st.chat_message("assistant"):
-                    # Create a container for the response
-                    response_container = st.container()
-                    
-                    # Display the response text
-                    response_container.write(answer_packet.text)
-                    
-                    # Add citations tooltip if available
-                    if answer_packet.citations:
-                        with response_container.expander("🔍 View Sources"):
-                            for citation in answer_packet.citations:
-                                source_type = citation.get("source", "Unknown")
-                                reference = citation.get("reference", "No reference provided")
-                                st.markdown(f"**{source_type}**: {reference}")
-                
                 # Log the interaction
                 logs.log_question(
                     question=prompt,
@@ -27,12 +27,13 @@ class FilterManager:
             new_set = set(new_values)
             current_set = current_state['selected'][filter_type_map[filter_type]]
             
-            # Handle additions
-            for item in new_set - current_set:
-                visualizer.select_filter(filter_type, item)
-            # Handle removals
-            for item in current_set - new_set:
-                visualizer.deselect_filter(filter_type, item)
+            with visualizer.batch():
+                # Handle additions
+                for item in new_set - current_set:
+                    visualizer.select_filter(filter_type, item)
+                # Handle removals
+                for item in current_set - new_set:
+                    visualizer.deselect_filter(filter_type, item)
 
     def render_filters(self, filter_state: Dict[str, Dict[str, Set[Any]]], visualizer) -> None:
         """Render all filter UI components"""
@@ -43,8 +44,8 @@ class FilterManager:
             # Asset Class filter
             new_asset_classes = st.multiselect(
                 "Asset Class",
-                options=list(filter_state['available']['asset_classes']),
-                default=list(filter_state['selected']['asset_classes'])
+                options=sorted(list(filter_state['available']['asset_classes'])),
+                default=sorted(list(filter_state['selected']['asset_classes']))
             )
             self.handle_hierarchical_filter_change(
                 new_asset_classes, filter_state, 'asset_class', visualizer
@@ -62,8 +63,8 @@ class FilterManager:
             # Product Type filter
             new_product_types = st.multiselect(
                 "Product Type",
-                options=list(filter_state['available']['product_types']),
-                default=list(filter_state['selected']['product_types'])
+                options=sorted(list(filter_state['available']['product_types'])),
+                default=sorted(list(filter_state['selected']['product_types']))
             )
             self.handle_hierarchical_filter_change(
                 new_product_types, filter_state, 'product_type', visualizer
@@ -81,8 +82,8 @@ class FilterManager:
             # Product filter
             new_products = st.multiselect(
                 "Product",
-                options=list(filter_state['available']['products']),
-                default=list(filter_state['selected']['products'])
+                options=sorted(list(filter_state['available']['products'])),
+                default=sorted(list(filter_state['selected']['products']))
             )
             self.handle_hierarchical_filter_change(
                 new_products, filter_state, 'product', visualizer
@@ -3,8 +3,9 @@ aggregator.py
 AI agent for aggregating results from multiple tasks into a final answer.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Callable
 import json
+import re
 from services.ai_workflow.data_model import (
     BreakdownQueryResult,
     PlanningResult,
@@ -12,7 +13,7 @@ from services.ai_workflow.data_model import (
     RetrievalResult,
     AnswerPacket
 )
-from services.ai_workflow.utils.openai_utils import call_openai
+from services.ai_workflow.utils.openai_utils import call_openai, call_openai_stream
 import logging
 
 # Configure logging
@@ -22,6 +23,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Locates the start of the "answer" string value in the (partial) tool call arguments
+_ANSWER_FIELD_RE = re.compile(r'"answer"\s*:\s*"')
+
 def get_aggregator_tools() -> List[Dict[str, Any]]:
     """Get the function schema for result aggregation."""
     return [
@@ -111,12 +115,47 @@ Example Bad Output:
 {all_task_info_str}
 """
 
+def _get_partial_answer(arguments: str) -> Optional[str]:
+    """
+    Extract the "answer" text from tool call arguments which may still be streaming in.
+    Returns None if the answer field hasn't started yet.
+    """
+    match = _ANSWER_FIELD_RE.search(arguments)
+    if not match:
+        return None
+
+    # Cut at the closing quote of the answer, if it has arrived already
+    raw = arguments[match.end():]
+    escaped = False
+    for i, ch in enumerate(raw):
+        if escaped:
+            escaped = False
+        elif ch == '\\':
+            escaped = True
+        elif ch == '"':
+            raw = raw[:i]
+            break
+
+    # The tail may hold a half-received escape sequence (e.g. "\u00"), trim it until it decodes
+    for trim in range(7):
+        try:
+            return json.loads(f'"{raw[:len(raw) - trim]}"')
+        except json.JSONDecodeError:
+            continue
+    return None
+
 def aggregate_results(
     user_query: str,
-    all_task_info_str: str
+    all_task_info_str: str,
+    on_answer_delta: Optional[Callable[[str], None]] = None
 ) -> AnswerPacket:
     """
     Aggregate results from multiple tasks into a final answer.
+
+    Args:
+        user_query: The original user query
+        all_task_info_str: The information of all completed tasks
+        on_answer_delta: Optional, when given the response is streamed and this is called with the answer text generated so far
     """
     try:
         user_message = f"""Original Query: {user_query}
@@ -130,11 +169,22 @@ The goal is to make the answer immediately understandable and useful to someone
         tools = get_aggregator_tools()
         system_prompt = get_aggregator_system_prompt(all_task_info_str)
 
-        response = call_openai(
+        tool_choice = {"type": "function", "function": {"name": "aggregate_results"}}
+
+        if on_answer_delta is None:
+            response = call_openai(system_prompt, user_message, tools, tool_choice=tool_choice)
+        else:
+            def _on_arguments_delta(arguments: str) -> None:
+                partial_answer = _get_partial_answer(arguments)
+                if partial_answer:
+                    on_answer_delta(partial_answer)
+
+            response = call_openai_stream(
                     system_prompt,
                     user_message,
                     tools,
-                    tool_choice={"type": "function", "function": {"name": "aggregate_results"}}
+                    tool_choice=tool_choice,
+                    on_arguments_delta=_on_arguments_delta
                     )
 
 
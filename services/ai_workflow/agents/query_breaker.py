@@ -71,7 +71,9 @@ def get_breakdown_system_prompt(prior_tasks_info: str) -> str:
         }
     """
 
-    # Ask to consider the completed tasks
+    # Ask to consider the completed tasks.
+    # NOTE: The completed tasks are kept at the very end of the prompt, so the static part above stays an
+    # identical prefix across calls and can be served from OpenAI's prompt cache.
     completed_tasks_ask = "\nPlease consider these completed tasks and their results when breaking down remaining work.\n"
 
     task_breakdown_eg_str = common_utils.get_task_breakdown_eg_str()
@@ -112,11 +114,6 @@ CRITICAL RULES:
 {output_format_str}
 ------
 
-### tasks_completed ###
-{completed_tasks_ask}
-{prior_tasks_info}
-------
-
 ------
 ### Some Examples of tasks_completed ###
 {task_breakdown_eg_str}
@@ -128,6 +125,12 @@ CRITICAL RULES:
 {available_products_str}
 {pr_available_in_storage_str}    
 ------
+
+------
+### tasks_completed ###
+{completed_tasks_ask}
+{prior_tasks_info}
+------
 """
     return the_prompt
 
@@ -45,10 +45,20 @@ def get_validator_tools() -> List[Dict[str, Any]]:
 def get_validator_system_prompt(input_for_validator: InputForValidator, prior_tasks_info: str) -> str:
     """
     Get the system prompt for the validator.
+    The static rules go first and the task specific details go last, so the rules are a stable prefix for prompt caching.
     """
     return f"""
 You are the Validator. Your job is to judge if the result satisfies the subtask.
 
+Rules:
+- Confidence_of_result is between 0.0 and 1.0.
+- High confidence if result matches intent and seems correct.
+- Lower confidence if result is incomplete, irrelevant, or inconsistent.
+- confidence_reason must clearly explain why the score was given.
+- If it's a AGGREGATION task, you should let it pass! It's not necessary to validate the result of the AGGREGATION task.
+
+Output: call the validate_result function with confidence_of_result and confidence_reason.
+
 Original query:
 {input_for_validator.org_query}
 
@@ -67,15 +77,6 @@ Task approach (SQL query, search string, math expression):
 Task result:
 {input_for_validator.task_result}
 
-Rules:
-- Confidence_of_result is between 0.0 and 1.0.
-- High confidence if result matches intent and seems correct.
-- Lower confidence if result is incomplete, irrelevant, or inconsistent.
-- confidence_reason must clearly explain why the score was given.
-- If it's a AGGREGATION task, you should let it pass! It's not necessary to validate the result of the AGGREGATION task.
-
-Output: call the validate_result function with confidence_of_result and confidence_reason.
-
 ------
 ### This is just for your information, these are the tasks that have been previously completed and their results ###
 {prior_tasks_info}
@@ -4,7 +4,7 @@ High-level orchestrator for handling MAR queries with Snowflake + Pinecone.
 """
 
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from services.ai_workflow.agents.query_breaker import break_down_query
 from services.ai_workflow.agents.task_planner import plan_query_action
 from services.ai_workflow.agents.aggregator import aggregate_results
@@ -33,13 +33,16 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def handle_user_query(user_query: str, history: List[Dict[str, str]]) -> AnswerPacket:
+def handle_user_query(user_query: str, history: List[Dict[str, str]], on_answer_delta: Optional[Callable[[str], None]] = None) -> AnswerPacket:
     """
         High-level entrypoint for query processing:
         0. Receptionist: decide if we need to clarify with user or proceed
         1. Break down query into tasks
         2. Process tasks one by one, with iterative refinement
         3. Aggregate results into final answer
+
+        If on_answer_delta is given, the final answer is streamed into it (the answer text generated so far)
+        while the aggregator is still writing it.
     """
 
     # --- Receptionist step ---
@@ -58,9 +61,9 @@ def handle_user_query(user_query: str, history: List[Dict[str, str]]) -> AnswerP
     cleaned_query = reception_result.next_step_content
 
     # --- Then continue your current pipeline ---
-    return _process_tasks(cleaned_query)  # wrap your current loop into a helper
+    return _process_tasks(cleaned_query, on_answer_delta)  # wrap your current loop into a helper
 
-def _process_tasks(user_query: str) -> AnswerPacket:
+def _process_tasks(user_query: str, on_answer_delta: Optional[Callable[[str], None]] = None) -> AnswerPacket:
     """
     High-level entrypoint for query processing:
     1. Break down query into tasks
@@ -215,7 +218,7 @@ def _process_tasks(user_query: str) -> AnswerPacket:
         # If the last task was AGGREGATION, aggregate and return
         if tasks_completed[-1].todo_intent == TodoIntent.AGGREGATION:
             all_task_info_str = contruct_task_info_str_for_aggregator(tasks_completed, tasks_results)
-            agg_result = aggregate_results(user_query, all_task_info_str)
+            agg_result = aggregate_results(user_query, all_task_info_str, on_answer_delta=on_answer_delta)
 
             if DEBUG_MODE:
                 print("="*100)
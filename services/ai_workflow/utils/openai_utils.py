@@ -13,11 +13,47 @@ model = MAR_ORCHESTRATOR_MODEL
 
 import time
 import logging
-from typing import List, Dict, Any, Optional, Union
+from types import SimpleNamespace
+from typing import List, Dict, Any, Optional, Union, Callable
 from openai import OpenAIError
 
 logger = logging.getLogger(__name__)
 
+def _normalize_tool_choice(tool_choice: Union[str, Dict[str, Any]]) -> Union[str, Dict[str, Any]]:
+    """Lowercase a string tool_choice, falling back to 'auto' when it isn't one OpenAI accepts."""
+    if isinstance(tool_choice, str):
+        tool_choice = tool_choice.lower()
+        if tool_choice not in ("none", "auto", "required"):
+            logger.warning(f"Invalid tool_choice '{tool_choice}', defaulting to 'auto'")
+            tool_choice = "auto"
+    return tool_choice
+
+
+def _call_with_retries(call: Callable[[], Any], call_name: str, retries: int, backoff: float) -> Optional[Any]:
+    """
+    Run an OpenAI call, retrying OpenAI errors with exponential backoff.
+
+    Returns:
+        The result of the call, or None if all retries fail or an unexpected error is raised
+    """
+    for attempt in range(retries):
+        try:
+            return call()
+
+        except OpenAIError as e:
+            wait_time = backoff * (2 ** attempt)
+            logger.error(f"{call_name} failed (attempt {attempt+1}/{retries}): {e}")
+            if attempt < retries - 1:
+                logger.info(f"Retrying in {wait_time:.1f} seconds...")
+                time.sleep(wait_time)
+            else:
+                logger.critical("All retries exhausted. Returning None.")
+                return None
+        except Exception as e:
+            logger.exception(f"Unexpected error in {call_name}: {e}")
+            return None
+
+
 def call_openai(
     system_prompt: str,
     user_query: str,
@@ -40,36 +76,91 @@ def call_openai(
     Returns:
         The OpenAI response object, or None if all retries fail
     """
-    # Normalize tool_choice
-    if isinstance(tool_choice, str):
-        tool_choice = tool_choice.lower()
-        if tool_choice not in ("none", "auto", "required"):
-            logger.warning(f"Invalid tool_choice '{tool_choice}', defaulting to 'auto'")
-            tool_choice = "auto"
+    tool_choice = _normalize_tool_choice(tool_choice)
 
-    for attempt in range(retries):
-        try:
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_query}
-                ],
-                tools=tools,
-                tool_choice=tool_choice,
-            )
-            return response
+    def call():
+        return client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_query}
+            ],
+            tools=tools,
+            tool_choice=tool_choice,
+        )
 
-        except OpenAIError as e:
-            wait_time = backoff * (2 ** attempt)
-            logger.error(f"OpenAI API call failed (attempt {attempt+1}/{retries}): {e}")
-            if attempt < retries - 1:
-                logger.info(f"Retrying in {wait_time:.1f} seconds...")
-                time.sleep(wait_time)
-            else:
-                logger.critical("All retries exhausted. Returning None.")
-                return None
-        except Exception as e:
-            logger.exception(f"Unexpected error in call_openai: {e}")
-            return None
+    return _call_with_retries(call, "call_openai", retries, backoff)
+
+
+def call_openai_stream(
+    system_prompt: str,
+    user_query: str,
+    tools: List[Dict[str, Any]],
+    tool_choice: Union[str, Dict[str, Any]] = "auto",
+    on_arguments_delta: Optional[Callable[[str], None]] = None,
+    retries: int = 3,
+    backoff: float = 2.0
+) -> Optional[Any]:
+    """
+    Same as call_openai, but streams the response so the caller can react to the tool call
+    arguments while they are still being generated (e.g. show the answer to the user early).
+
+    Args:
+        system_prompt: The system prompt to use
+        user_query: The user's query
+        tools: Function schema definitions
+        tool_choice: One of "none", "auto", "required", or dict to force a specific tool
+        on_arguments_delta: Called with the arguments of the first tool call generated so far
+        retries: Number of retries on failure
+        backoff: Backoff factor (seconds) between retries
+
+    Returns:
+        A response object shaped like the non-streaming one (response.choices[0].message.tool_calls),
+        so the existing parsers work unchanged. None if all retries fail.
+    """
+    tool_choice = _normalize_tool_choice(tool_choice)
+
+    def call():
+        stream = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_query}
+            ],
+            tools=tools,
+            tool_choice=tool_choice,
+            stream=True,
+        )
+
+        # Stitch the deltas back together, tool calls are keyed by their index
+        content_parts = []
+        tool_calls = {}
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+
+            if delta.content:
+                content_parts.append(delta.content)
+
+            for tc in delta.tool_calls or []:
+                entry = tool_calls.setdefault(tc.index, {"name": "", "arguments": ""})
+                if tc.function is None:
+                    continue
+                if tc.function.name:
+                    entry["name"] += tc.function.name
+                if tc.function.arguments:
+                    entry["arguments"] += tc.function.arguments
+                    if on_arguments_delta and tc.index == min(tool_calls):
+                        on_arguments_delta(entry["arguments"])
+
+        message = SimpleNamespace(
+            content="".join(content_parts) or None,
+            tool_calls=[
+                SimpleNamespace(function=SimpleNamespace(name=tc["name"], arguments=tc["arguments"]))
+                for _, tc in sorted(tool_calls.items())
+            ] or None
+        )
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
 
+    return _call_with_retries(call, "call_openai_stream", retries, backoff)
@@ -1,5 +1,4 @@
 import services.utils as utils
-import tiktoken
 import re
 import logging
 import spacy
@@ -191,7 +190,7 @@ def split_text_by_token_limit_BRUTE(text: str, model_name: str, max_tokens: int,
     logger.info(f"Brute force splitter got: {text}")
 
     # Get encoding for the model
-    enc = tiktoken.encoding_for_model(model_name)
+    enc = utils.get_token_encoding(model_name)
 
     # Encode full text into tokens
     token_ids = enc.encode(text)
@@ -60,6 +60,22 @@ PR_QUARTER_MAPPING = {
     "fourth": "q4"
 }
 
+# Month mapping, month name in the URL to the format MM
+PR_MONTH_MAPPING = {
+    "january": "01",
+    "february": "02",
+    "march": "03",
+    "april": "04",
+    "may": "05",
+    "june": "06",
+    "july": "07",
+    "august": "08",
+    "september": "09",
+    "october": "10",
+    "november": "11",
+    "december": "12"
+}
+
 ### URL-last-part patterns for monthly, quarterly and yearly press releases. Easy to update.
 # Monthly URL-last-part looks like "tradeweb-reports-august-2025-..."
 # Quarterly URL-last-part looks like "tradeweb-reports-first-quarter-2025-..."
@@ -131,6 +147,8 @@ PR_DEFAULT_CHUNK_OVERLAP_LINES = 1              # Num of lines allowed to overla
 
 PR_ADD_SIGNATURE_TO_CHUNKS = True
 
+PR_UPSERT_BATCH_SIZE = 96                       # Records per upsert request, Pinecone caps integrated-embedding upserts at 96 records
+
 # :::::: PR-M MD Embedding Related :::::: #
 
 PR_M_CHUNKING_STRATEGY = "one_line_per_chunk"           
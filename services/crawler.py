@@ -1,5 +1,5 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 import asyncio
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
 from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
@@ -18,6 +18,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Shared HTTP session, keeps the connections alive so repeated downloads skip the TCP + TLS handshake
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+_session.mount("http://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+
+# Timeout (seconds) for connecting to and reading from the server when downloading files
+DOWNLOAD_TIMEOUT = 30
+
 async def crawl_one(
     url: str,
     *,
@@ -176,7 +184,7 @@ def download_file(url: str, dest_dir: str, file_name: str = None, chunk_size: in
     Uses streaming so as not to load entire file into memory.
     """
     logger.info(f"Downloading file from {url} to {dest_dir}")
-    resp = requests.get(url, stream=True)
+    resp = _session.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT)
     resp.raise_for_status()  # raises exception for HTTP errors
 
     # Create the destination directory
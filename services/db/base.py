@@ -2,10 +2,18 @@
 from abc import ABC, abstractmethod
 from typing import Optional, Any, Union
 import pandas as pd
+import pyarrow as pa
 
 class Database(ABC):
     """Abstract base class that defines the interface for database implementations."""
     
+    # Positional placeholder for query parameters, in the style of the backend's driver
+    PARAM_PLACEHOLDER = "?"
+
+    def in_condition(self, column: str, values) -> tuple:
+        """Build a membership condition on a column, with all the values bound as one list parameter."""
+        return f"{column} = ANY({self.PARAM_PLACEHOLDER})", list(values)
+
     @abstractmethod
     def _run_migrations(self) -> None:
         """Run all SQL migrations in order."""
@@ -31,6 +39,11 @@ class Database(ABC):
         """Return query results as a pandas DataFrame."""
         pass
 
+    @abstractmethod
+    def fetch_arrow(self, query: str, params: Optional[tuple] = None) -> pa.Table:
+        """Return query results as a pyarrow Table, without converting them to pandas."""
+        pass
+
     @abstractmethod
     def replace_data_in_table(self, file_path: str, table_name: str) -> None:
         """Replace all data in a table with data from a parquet file.
@@ -59,6 +59,12 @@ class DuckDB(Database):
         '''
         return self.run_query(query, params).df()
 
+    def fetch_arrow(self, query: str, params: Optional[tuple] = None):
+        '''
+            DuckDB-specific: directly return a pyarrow Table, the columns are exported without copying.
+        '''
+        return self.run_query(query, params).fetch_arrow_table()
+
     def replace_data_in_table(self, file_path: str, table_name: str, schema: Optional[dict] = None) -> None:
         """Replace table data with contents from a parquet file."""
         self.run_query(f"""
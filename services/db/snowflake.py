@@ -4,6 +4,7 @@
 # ------------------------------
 
 import snowflake.connector
+import pyarrow as pa
 from typing import Optional
 import os
 import duckdb
@@ -27,6 +28,9 @@ class SnowflakeDB(Database):
     _instance = None
     _conn = None
 
+    # The connector's default paramstyle is pyformat
+    PARAM_PLACEHOLDER = "%s"
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(SnowflakeDB, cls).__new__(cls)
@@ -115,6 +119,11 @@ class SnowflakeDB(Database):
     def fetchall(self, query: str, params: Optional[tuple] = None):
         return self.run_query(query, params).fetchall()
 
+    def in_condition(self, column: str, values) -> tuple:
+        # The connector binds client side and renders a list parameter as comma-separated quoted values,
+        # without parentheses, so they are added around the placeholder
+        return f"{column} IN ({self.PARAM_PLACEHOLDER})", list(values)
+
     def fetchall_with_columns(self, query: str, params: Optional[tuple] = None):
         cursor = self.run_query(query, params)
         rows = cursor.fetchall()
@@ -125,6 +134,14 @@ class SnowflakeDB(Database):
         cur = self.conn.cursor()
         return cur.execute(query, params or ()).fetch_pandas_all()
 
+    def fetch_arrow(self, query: str, params: Optional[tuple] = None):
+        cur = self.conn.cursor()
+        table = cur.execute(query, params or ()).fetch_arrow_all()
+        # The connector returns None instead of an empty table when there are no rows
+        if table is None:
+            table = pa.table({desc[0]: [] for desc in cur.description})
+        return table
+
     def _get_snowflake_type(self, python_type: str) -> str:
         """Convert Python/Pandas dtype to Snowflake type."""
         type_mapping = {
@@ -1,17 +1,26 @@
 # services/embeddings/providers/hf_embedder.py
+import threading
 from typing import List
 from sentence_transformers import SentenceTransformer
 
-# # Load model once
-# _model = SentenceTransformer("all-MiniLM-L6-v2")
+# Load model once, lazily on the first call so importing this module stays cheap
+_model = None
+_model_lock = threading.Lock()
+
+def _get_model() -> SentenceTransformer:
+    """Return the shared SentenceTransformer model, loading it on the first call."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = SentenceTransformer("all-MiniLM-L6-v2")
+    return _model
 
 def embed_texts_hf(texts: List[str]) -> List[list[float]]:
     """
     Embed texts using SentenceTransformers MiniLM (local model).
     Returns list of embeddings (384-dim each).
     """
-    # Temporary put it here to avoid loading the model every time
-    _model = SentenceTransformer("all-MiniLM-L6-v2")
-
-    embs = _model.encode(texts, batch_size=32, show_progress_bar=False)
-    return [emb.tolist() for emb in embs]
+    # One numpy matrix for all texts, converted to lists in a single call instead of row by row
+    embs = _get_model().encode(texts, batch_size=64, convert_to_numpy=True, show_progress_bar=False)
+    return embs.tolist()
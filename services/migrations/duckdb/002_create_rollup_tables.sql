@@ -0,0 +1,22 @@
+-- MAR combined (monthly), loaded from the combined MAR parquet
+CREATE TABLE IF NOT EXISTS mar_combined_m (
+    asset_class TEXT,
+    product_type TEXT,
+    product TEXT,
+    year_month TEXT,
+    year INTEGER,
+    month INTEGER,
+    volume DOUBLE,
+    adv DOUBLE
+);
+
+-- MAR per-month totals over all products (rebuilt after every MAR load)
+CREATE TABLE IF NOT EXISTS mar_combined_month_totals_m AS
+SELECT
+    year_month,
+    year,
+    month,
+    SUM(volume) AS total_volume,
+    SUM(adv) AS total_adv
+FROM mar_combined_m
+GROUP BY year_month, year, month;
@@ -0,0 +1,10 @@
+-- MAR per-month totals over all products (rebuilt after every MAR load)
+CREATE TABLE IF NOT EXISTS mar_combined_month_totals_m AS
+SELECT
+    year_month,
+    year,
+    month,
+    SUM(volume) AS total_volume,
+    SUM(adv) AS total_adv
+FROM mar_combined_m
+GROUP BY year_month, year, month;
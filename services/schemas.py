@@ -2,36 +2,38 @@
 # Project schemas
 # ------------------------------
 
-MAR_VOLUME_SCHEMA = {
-    "asset_class": "string",
-    "product_type": "string",
-    "product": "string",
-    "year_month": "string",
-    "year": "int32",
-    "month": "int32",
-    "volume": "float64",
-    "updated_at": "string",  # Store as string in ISO format for better compatibility
-}
-
-MAR_TRADE_DAYS_SCHEMA = {
-    "asset_class": "string",
-    "product_type": "string",
-    "product": "string",
-    "year_month": "string",
-    "year": "int32",
-    "month": "int32",
-    "trade_days": "float64",
-    "updated_at": "string",  # Store as string in ISO format for better compatibility
-}
-
-MAR_COMBINED_SCHEMA = {
-    "asset_class": "string",
-    "product_type": "string",
-    "product": "string",
-    "year_month": "string",
-    "year": "int32",
-    "month": "int32",
-    "volume": "float64",
-    "adv": "float64",
-    "updated_at": "string",  # Store as string in ISO format for better compatibility
-}
\ No newline at end of file
+from functools import lru_cache
+from types import MappingProxyType
+
+# Columns shared by all MAR schemas, the value columns go after these
+_BASE = (
+    ("asset_class", "string"),
+    ("product_type", "string"),
+    ("product", "string"),
+    ("year_month", "string"),
+    ("year", "int32"),
+    ("month", "int32"),
+)
+
+# Store as string in ISO format for better compatibility
+_UPDATED_AT = (("updated_at", "string"),)
+
+@lru_cache(maxsize=None)
+def make_mar_schema(value_cols=(("volume", "float64"),)):
+    '''
+        Build a MAR schema of {column: dtype} from the shared base columns.
+        The result is cached and read-only, so each schema only exists once.
+
+        Args:
+            value_cols: tuple of (column, dtype) pairs for the value columns
+
+        Returns:
+            Read-only mapping of {column: dtype}
+    '''
+    return MappingProxyType(dict(_BASE + tuple(value_cols) + _UPDATED_AT))
+
+MAR_VOLUME_SCHEMA = make_mar_schema((("volume", "float64"),))
+
+MAR_TRADE_DAYS_SCHEMA = make_mar_schema((("trade_days", "float64"),))
+
+MAR_COMBINED_SCHEMA = make_mar_schema((("volume", "float64"), ("adv", "float64")))
@@ -27,9 +27,80 @@ logger = logging.getLogger(__name__)
 # Instantiate DB object
 db = get_database()
 
+# Prefer the calamine (Rust) parser for the MAR workbook, fall back to openpyxl if it's not installed
+try:
+    import python_calamine  # noqa: F401
+    MAR_EXCEL_ENGINE = "calamine"
+except ImportError:
+    MAR_EXCEL_ENGINE = "openpyxl"
+
 # Supported MAR tabs to parse
 mar_tabs = MAR_SHEETS_TO_FILE_MAPPINGS.keys()
 
+# Drops the Total / Grand Total rows and melts the month columns of a cleaned MAR tab (registered as raw_mar) into rows.
+# INCLUDE NULLS keeps the empty months, their value is filled with 0.
+MAR_UNPIVOT_QUERY = """
+    SELECT
+        asset_class,
+        product_type,
+        product,
+        COALESCE(value, 0) AS {value_col_name},
+        year(month_year_dt) AS year,
+        month(month_year_dt) AS month,
+        strftime(month_year_dt, '%Y-%m') AS year_month
+    FROM (
+        SELECT *, strptime(month_year, '%b_%Y') AS month_year_dt
+        FROM (
+            SELECT *
+            FROM raw_mar
+            WHERE NOT COALESCE(
+                asset_class IN ('total', 'grand total')
+                OR product_type IN ('total', 'grand total')
+                OR product IN ('total', 'grand total'),
+                FALSE
+            )
+        )
+        UNPIVOT INCLUDE NULLS (value FOR month_year IN (COLUMNS(* EXCLUDE (asset_class, product_type, product))))
+    )
+"""
+
+# Full outer joins the ADV tab (registered as mar_adv) and the Volume tab (registered as mar_volume).
+# The keys are compared with IS NOT DISTINCT FROM, so rows without a product still find their match.
+MAR_COMBINE_QUERY = """
+    SELECT
+        COALESCE(a.asset_class, v.asset_class) AS asset_class,
+        COALESCE(a.product_type, v.product_type) AS product_type,
+        COALESCE(a.product, v.product) AS product,
+        a.volume AS adv,
+        COALESCE(a.year, v.year) AS year,
+        COALESCE(a.month, v.month) AS month,
+        COALESCE(a.year_month, v.year_month) AS year_month,
+        v.volume AS volume
+    FROM mar_adv a
+    FULL OUTER JOIN mar_volume v
+        ON a.asset_class IS NOT DISTINCT FROM v.asset_class
+        AND a.product_type IS NOT DISTINCT FROM v.product_type
+        AND a.product IS NOT DISTINCT FROM v.product
+        AND a.year_month = v.year_month
+"""
+
+# Rebuilds the per-month totals over all products, which the dashboard uses for its MoM and YoY baselines.
+# Run after every load of mar_combined_m, so the dashboard never has to aggregate the full table for them.
+MAR_MONTH_TOTALS_QUERY = """
+    CREATE OR REPLACE TABLE mar_combined_month_totals_m AS
+    SELECT
+        year_month,
+        year,
+        month,
+        SUM(volume) AS total_volume,
+        SUM(adv) AS total_adv
+    FROM mar_combined_m
+    GROUP BY year_month, year, month
+"""
+
+# Columns of the MAR snapshots that only repeat a handful of distinct values
+MAR_CATEGORY_COLS = ['asset_class', 'product_type', 'product', 'year_month']
+
 # For debugging purposes only
 pd.set_option("display.max_rows", None)     # show all rows
 pd.set_option("display.max_columns", None) # show all columns
@@ -54,18 +125,46 @@ def handle_mar_update(file):
     '''
         Module handles the mar upload process.
     '''
-    # Parse the MAR file into files for each tab
-    for tab in mar_tabs:
-        parse_mar_to_file(file, tab)
+    # One timestamp for the whole update, so all tabs and the combined file carry the same updated_at
+    updated_at = datetime.now().isoformat()
+
+    # Parse the tabs of the MAR file, the workbook is only opened once for all tabs.
+    # The parsed tabs are handed to the combine step in memory, so no per-tab snapshot is written
+    xl = open_mar_workbook(file)
+    try:
+        mar_dfs = {}
+        for tab in mar_tabs:
+            mar_dfs[MAR_SHEETS_TO_FILE_MAPPINGS[tab]] = parse_mar_to_file(xl, tab, save_snapshot=False, updated_at=updated_at)
+    finally:
+        xl.close()
+
+    # The latest month of the parsed tabs is the snapshot folder for this update, no need to scan for it later
+    latest_year_month = max(df['year_month'].max() for df in mar_dfs.values())
 
     # Combine the latest MAR files
-    combine_latest_mar(file_type='monthly')
+    combine_latest_mar(file_type='monthly', mar_dfs=mar_dfs, updated_at=updated_at, latest_year_month=latest_year_month)
 
     # Update the database with the latest combined MAR files
-    update_db_with_latest_mar()
+    update_db_with_latest_mar(latest_year_month=latest_year_month)
 
     return True
 
+def open_mar_workbook(file):
+    '''
+        Open the MAR file for parsing, using the calamine engine when it's available.
+
+        Args:
+            file: The path to the MAR file
+
+        Returns:
+            pd.ExcelFile: The opened workbook, the caller is responsible for closing it
+    '''
+    if MAR_EXCEL_ENGINE == "calamine":
+        return pd.ExcelFile(file, engine="calamine")
+
+    # read_only makes openpyxl stream the rows instead of building every cell object in memory
+    return pd.ExcelFile(file, engine="openpyxl", engine_kwargs={"read_only": True, "data_only": True})
+
 def crawl_latest_mar_file():
     '''
         Module crawls the latest MAR file from the website
@@ -167,14 +266,61 @@ def get_latest_mar_file_from_storage():
     latest_file = max(mar_files, key=lambda x: x[0])[1]
     return latest_file
 
-def parse_mar_to_file(file, sheet_name):
+def save_mar_parquet(df, file_path):
+    '''
+        Save a MAR DataFrame as a parquet file.
+        The repeated string columns are stored as categories, so they're written as a dictionary plus small codes.
+
+        Args:
+            df: The MAR DataFrame, with the schema already enforced
+            file_path: The path of the parquet file
+    '''
+    category_cols = {col: 'category' for col in MAR_CATEGORY_COLS if col in df.columns}
+
+    # The files are small, local and read straight back (or PUT with AUTO_COMPRESS to Snowflake),
+    # so block compression only adds encode/decode time
+    df.astype(category_cols).to_parquet(
+        file_path,
+        index=False,
+        engine='pyarrow',
+        compression=None,
+        use_dictionary=True,
+        data_page_size=1 << 20
+    )
+
+def get_latest_mar_snapshot_year_month():
+    '''
+        Find the latest snapshot folder (named YYYY-MM) in MAR_FILES_FOLDER_PATH_STR.
+
+        Returns:
+            str: The year and month of the latest snapshot, e.g. '2025-08'
+    '''
+    # scandir gets the entry type along with the name, so there is no extra stat call per folder
+    with os.scandir(MAR_FILES_FOLDER_PATH_STR) as entries:
+        folder_names = [
+            entry.name for entry in entries
+            if entry.is_dir() and len(entry.name) == 7 and entry.name[4] == '-'
+        ]
+
+    if not folder_names:
+        raise FileNotFoundError(f"No MAR snapshots found in {MAR_FILES_FOLDER_PATH_STR}")
+
+    # YYYY-MM sorts the same as a string and as a date, so no date parsing is needed
+    return max(folder_names)
+
+def parse_mar_to_file(xl, sheet_name, save_snapshot=True, updated_at=None):
     '''
         Module ingests TABs of MAR file into the database.
         It supports ADV, Volume, Trade Days tabs across monthly, quarterly and yearly data.
 
         Args:
-            file: The path to the MAR file
+            xl: The opened MAR file (pd.ExcelFile)
             sheet_name: The name of the sheet to ingest
+            save_snapshot: If True, save the parsed tab as a parquet in the latest snapshot folder
+            updated_at: Optional, the ISO format timestamp of the update. Defaults to now.
+
+        Returns:
+            DataFrame: The parsed tab
     '''
     # :::::: Data Loading :::::: #
 
@@ -184,10 +330,10 @@ def parse_mar_to_file(file, sheet_name):
     if sheet_name not in supported_sheet_names:
         raise ValueError(f"Unsupported sheet name: {sheet_name}")
 
-    logger.info(f"Processing {sheet_name} from {file}")
+    logger.info(f"Processing {sheet_name}")
     
     # Load starting from row 2 (headers are Asset Class, Product, then months)
-    df = pd.read_excel(file, sheet_name=sheet_name, header=1)
+    df = xl.parse(sheet_name, header=1)
 
     # :::::: Define Variables :::::: #
 
@@ -206,46 +352,32 @@ def parse_mar_to_file(file, sheet_name):
     df.rename(columns={df.columns[2]: 'product'}, inplace=True)
     df.rename(columns={col: col.lower().replace(" ", "_") for col in df.columns}, inplace=True)
 
-    # Regularize the format for each cell to prepare for filtering process
-    df = df.map(lambda x: x.strip().lower() if isinstance(x, str) else x)
+    # Regularize the format of the hierarchy columns to prepare for filtering process.
+    # The month columns hold numbers only, so they are left untouched. Non-string labels (an empty
+    # column read as float, a numeric product name) are kept as they are, like before
+    for col in ['asset_class', 'product_type', 'product']:
+        df[col] = df[col].map(lambda x: x.strip().lower() if isinstance(x, str) else x)
 
     # Forward fill asset_class and product hierarchies
     ffill_cols = ['asset_class', 'product_type']
     for col in ffill_cols:
         df[col] = df[col].ffill()
 
-    # Remove rows where it's standing for Total or Grand Total
-    mask = (
-        (df['asset_class'].astype(str).isin(['total', 'grand total'])) |
-        (df['product_type'].astype(str).isin(['total', 'grand total'])) |
-        (df['product'].astype(str).isin(['total', 'grand total']))
-    )
-    df = df[~mask]
-
-    # Melt months into rows
-    avoid_melt_cols = ['asset_class', 'product_type', 'product']
-    df = df.melt(
-        id_vars = avoid_melt_cols,
-        var_name = 'month_year',
-        value_name = value_col_name
-    )
-
-    # Create year and month columns
-    df['month_year_dt'] = pd.to_datetime(df['month_year'], format='%b_%Y')
-    df['year'] = df['month_year_dt'].dt.year
-    df['month'] = df['month_year_dt'].dt.month
-
-    # Convert year_month with format 'YYYY-MM'
-    df['year_month'] = df['month_year_dt'].apply(lambda x: f"{x.year}-{x.month:02d}")
+    # Get the latest month and year from the month column headers (like 'aug_2025'), before melting them into rows
+    month_cols = [col for col in df.columns if col not in ('asset_class', 'product_type', 'product')]
+    latest_year_month = max(datetime.strptime(col, '%b_%Y') for col in month_cols).strftime('%Y-%m')
 
-    # Drop unnecessary columns
-    df = df.drop(columns=['month_year_dt', 'month_year'])
-
-    # Fill the value column with 0 if it's NaN
-    df[value_col_name] = df[value_col_name].fillna(0)
+    # Remove the rows standing for Total or Grand Total, melt months into rows and derive the date columns,
+    # all in one vectorized DuckDB pass
+    con = duckdb.connect()
+    try:
+        con.register('raw_mar', df)
+        df = con.execute(MAR_UNPIVOT_QUERY.format(value_col_name=value_col_name)).df()
+    finally:
+        con.close()
 
     # Add updated_at timestamp as ISO format string
-    df['updated_at'] = pd.Timestamp.now().isoformat()
+    df['updated_at'] = updated_at or datetime.now().isoformat()
 
     # Enforce the schema
     df = enforce_schema(df, schema)
@@ -254,29 +386,33 @@ def parse_mar_to_file(file, sheet_name):
 
     # :::::: Prepare to Save :::::: #
 
-    # Get the latest month and year and use it as the output directory
-    df_dt_sorted = df.sort_values(['year', 'month']).iloc[-1]
-    latest_year_month = df_dt_sorted['year_month']
+    if not save_snapshot:
+        return df
 
-    # Build the output directory
-    out_dir = f'storage/snapshots/mar/{latest_year_month}'
+    # Build the output directory, named by the latest month and year
+    out_dir = f'{MAR_FILES_FOLDER_PATH_STR}/{latest_year_month}'
     os.makedirs(out_dir, exist_ok=True)
 
     # Save the latest parsed MAR file as a parquet
     out_file_name = MAR_SHEETS_TO_FILE_MAPPINGS[sheet_name]
-    df.to_parquet(f'{out_dir}/{out_file_name}', index=False)
+    save_mar_parquet(df, f'{out_dir}/{out_file_name}')
 
     logger.info(f'Saved {sheet_name} to {out_dir}/{out_file_name}')
 
-    return True
+    return df
 
-def combine_latest_mar(file_type='monthly'):
+def combine_latest_mar(file_type='monthly', mar_dfs=None, updated_at=None, latest_year_month=None):
     '''
     Combines the latest MAR files based on the file type (monthly, quarterly, yearly).
     Currently supports combining ADV and Volume files.
     
     Args:
         file_type (str): Type of files to combine. One of 'monthly', 'quarterly', 'yearly'
+        mar_dfs (dict): Optional, the parsed tabs keyed by their snapshot file name (see MAR_SHEETS_TO_FILE_MAPPINGS).
+                        If not given, the tabs are read from the latest snapshot folder.
+        updated_at (str): Optional, the ISO format timestamp of the update. Defaults to now.
+        latest_year_month (str): Optional, the snapshot folder (YYYY-MM) to use. Found from the data or the
+                                 snapshot folders if not given.
         
     Returns:
         bool: True if operation was successful
@@ -294,65 +430,88 @@ def combine_latest_mar(file_type='monthly'):
         
     suffix = type_suffix_map[file_type]
     
-    # Get the folder with the latest data
-    folder_path = Path(MAR_FILES_FOLDER_PATH_STR)
-    latest_year_month = max((p for p in folder_path.iterdir() if p.is_dir()),
-                        key=lambda x: datetime.strptime(x.name, "%Y-%m")).name
-    
-    # The files' path
-    latest_files_path = f'{MAR_FILES_FOLDER_PATH_STR}/{latest_year_month}'
-    adv_file = f'{latest_files_path}/mar_adv{suffix}.parquet'
-    volume_file = f'{latest_files_path}/mar_volume{suffix}.parquet'
-    
-    # Check if both files exist
-    if os.path.exists(adv_file) and os.path.exists(volume_file):
-        logger.info(f'Found both ADV and Volume files ({file_type}) in {latest_year_month}. Combining them...')
-        
-        # Read both files
-        df_adv = pd.read_parquet(adv_file)
-        df_volume = pd.read_parquet(volume_file)
-        
-        # Rename volume column in ADV to adv
-        df_adv = df_adv.rename(columns={'volume': 'adv'})
-        
-        # Perform full outer join
-        df_combined = pd.merge(
-            df_adv,
-            df_volume,
-            on=['asset_class', 'product', 'product_type', 'year_month'],
-            how='outer',
-            suffixes=('', '_y')  # Only add suffix to right table's duplicate columns
-        )
-        
-        # Drop duplicate year and month columns from the right table
-        columns_to_drop = ['year_y', 'month_y', 'updated_at_y']  # Also drop the duplicate updated_at
-        df_combined = df_combined.drop(columns=[col for col in columns_to_drop if col in df_combined.columns])
+    # Join the ADV and Volume tabs in DuckDB, either straight from the parsed tabs or from the snapshot files
+    con = duckdb.connect()
+    try:
+        if mar_dfs is not None:
+            # The parsed tabs are handed over in memory, no need to read them back from disk
+            df_adv = mar_dfs.get(f'mar_adv{suffix}.parquet')
+            df_volume = mar_dfs.get(f'mar_volume{suffix}.parquet')
+            if df_adv is None or df_volume is None:
+                raise ValueError(f'Either ADV or Volume data ({file_type}) is missing. No combination can be done.')
+
+            # The combined file goes to the folder of the latest month in the data
+            if latest_year_month is None:
+                latest_year_month = df_volume['year_month'].max()
+            latest_files_path = f'{MAR_FILES_FOLDER_PATH_STR}/{latest_year_month}'
+            os.makedirs(latest_files_path, exist_ok=True)
+
+            con.register('mar_adv', df_adv)
+            con.register('mar_volume', df_volume)
+        else:
+            # Get the folder with the latest data
+            if latest_year_month is None:
+                latest_year_month = get_latest_mar_snapshot_year_month()
+            
+            # The files' path
+            latest_files_path = f'{MAR_FILES_FOLDER_PATH_STR}/{latest_year_month}'
+            adv_file = f'{latest_files_path}/mar_adv{suffix}.parquet'
+            volume_file = f'{latest_files_path}/mar_volume{suffix}.parquet'
+            
+            # Check if both files exist
+            if not (os.path.exists(adv_file) and os.path.exists(volume_file)):
+                raise FileNotFoundError(f'Either ADV or Volume file ({file_type}) is missing. No combination can be done.')
+
+            logger.info(f'Found both ADV and Volume files ({file_type}) in {latest_year_month}.')
+
+            # DuckDB scans the files directly, they're never loaded into pandas on their own
+            con.execute(f"CREATE VIEW mar_adv AS SELECT * FROM read_parquet('{adv_file}')")
+            con.execute(f"CREATE VIEW mar_volume AS SELECT * FROM read_parquet('{volume_file}')")
+
+        logger.info(f'Combining ADV and Volume ({file_type}) for {latest_year_month}...')
+
+        # Perform full outer join, the volume column of ADV tab is the adv
+        df_combined = con.execute(MAR_COMBINE_QUERY).df()
+    finally:
+        con.close()
+
+    # Update the timestamp for the combined file as ISO format string
+    df_combined['updated_at'] = updated_at or datetime.now().isoformat()
 
-        # Update the timestamp for the combined file as ISO format string
-        df_combined['updated_at'] = pd.Timestamp.now().isoformat()
-
-        # Enforce the schema
-        df_combined = enforce_schema(df_combined, MAR_COMBINED_SCHEMA)
-        
-        # Save the combined file
-        combined_file = f'{latest_files_path}/mar_combined{suffix}.parquet'
-        df_combined.to_parquet(combined_file, index=False)
-        logger.info(f'Saved combined file to {combined_file}')
+    # Enforce the schema
+    df_combined = enforce_schema(df_combined, MAR_COMBINED_SCHEMA)
+    
+    # Save the combined file
+    combined_file = f'{latest_files_path}/mar_combined{suffix}.parquet'
+    save_mar_parquet(df_combined, combined_file)
+    logger.info(f'Saved combined file to {combined_file}')
 
-        return True
-    else:
-        raise FileNotFoundError(f'Either ADV or Volume file ({file_type}) is missing. No combination can be done.')
+    return True
 
-def update_db_with_latest_mar():
+def refresh_mar_rollup_tables():
+    '''
+    Rebuild the pre-aggregated tables derived from mar_combined_m.
+    Raises if the rebuild fails, the dashboard baselines would otherwise no longer match mar_combined_m.
+    '''
+    try:
+        db.run_query(MAR_MONTH_TOTALS_QUERY)
+        logger.info('Refreshed mar_combined_month_totals_m')
+    except Exception as e:
+        logger.error(f'Failed to refresh mar_combined_month_totals_m: {str(e)}')
+        raise
+
+def update_db_with_latest_mar(latest_year_month=None):
     '''
     Module ingests the combined MAR files into the database.
     Uses MAR_FILE_NAMES_FOR_DB to determine which files to ingest
     and MAR_COMBINED_SCHEMA for schema validation.
+
+    Args:
+        latest_year_month (str): Optional, the snapshot folder (YYYY-MM) to ingest from. The latest one if not given.
     '''
     # Get the folder with the latest data (folder name is the YYYY-MM)
-    folder_path = Path(MAR_FILES_FOLDER_PATH_STR)
-    latest_year_month = max((p for p in folder_path.iterdir() if p.is_dir()),
-                            key=lambda x: datetime.strptime(x.name, "%Y-%m")).name
+    if latest_year_month is None:
+        latest_year_month = get_latest_mar_snapshot_year_month()
     
     # The files' path
     latest_files_path = f'{MAR_FILES_FOLDER_PATH_STR}/{latest_year_month}'
@@ -368,13 +527,19 @@ def update_db_with_latest_mar():
             logger.info(f'Found file to ingest: {file_path}')
 
     # Load files to tables
+    loaded_tables = []
     for file_path, table_name in files_to_ingest:
         try:
             db.replace_data_in_table(file_path, table_name, schema=MAR_COMBINED_SCHEMA)
+            loaded_tables.append(table_name)
             logger.info(f'Loaded {file_path} to {table_name}')
         except Exception as e:
             logger.error(f'Failed to load {file_path} to {table_name}: {str(e)}')
 
+    # The rollups are derived from mar_combined_m, so only rebuild them when it was actually reloaded
+    if 'mar_combined_m' in loaded_tables:
+        refresh_mar_rollup_tables()
+
     if files_to_ingest:
         logger.info(f'Loaded the latest MAR files to tables. The latest year and month is {latest_year_month}')
     else:
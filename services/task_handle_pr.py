@@ -1,6 +1,5 @@
 from services.db import get_database
 import requests
-from bs4 import BeautifulSoup
 import services.crawler as crawler
 import logging
 import asyncio
@@ -8,9 +7,8 @@ import os
 import hashlib
 import json
 import re
-from datetime import datetime
-import copy
 import numpy as np
+from functools import lru_cache
 
 from services.constants import *
 import services.chunk_utils as chunk_utils
@@ -28,6 +26,24 @@ logger = logging.getLogger(__name__)
 # Instantiate DB object
 db = get_database()
 
+# Classifies a press release URL in one pass, the name of the matched group is the report type.
+# Compiled once, as it's used to classify every crawled press release URL
+REPORT_TYPE_RE = re.compile(
+    f"(?P<monthly>{MONTHLY_PR_PATTERN})|(?P<quarterly>{QUARTERLY_PR_PATTERN})|(?P<yearly>{YEARLY_PR_PATTERN})",
+    re.IGNORECASE
+)
+
+# The broad-match patterns as one alternation each, so a line is searched once in the regex engine.
+# All patterns are lowercased once here, as they are matched against lowercased lines.
+# The content separator is only searched until its first match, so it ignores case instead of lowercasing each line
+PR_M_MD_HEAD_RM_RE = re.compile('|'.join(re.escape(p.lower()) for p in PR_M_MD_HEAD_RM_PATTERNS))
+PR_M_MD_TAIL_RM_RE = re.compile('|'.join(re.escape(p.lower()) for p in PR_M_MD_TAIL_RM_PATTERNS))
+PR_M_MD_CONTENT_SEPARATE_RE = re.compile('|'.join(re.escape(p.lower()) for p in PR_M_MD_CONTENT_SEPARATE_PATTERN), re.IGNORECASE)
+
+# The exact-match patterns as sets, so matching a line is a hash lookup rather than a scan over the list
+PR_M_MD_TAIL_SECTION_RM_SET = frozenset(p.lower() for p in PR_M_MD_TAIL_SECTION_RM_PATTERNS)
+PR_M_MD_LINES_TO_RM_SET = frozenset(p.lower() for p in PR_M_MD_LINES_TO_RM)
+
 async def fetch_many_press_releases(urls: list[str]) -> list[str]:
     """
         Fetch many press releases concurrently.
@@ -117,7 +133,7 @@ async def fetch_press_release(url: str) -> str:
                                         meta_data = meta_data)
     return result
 
-def try_rm_junk_part_for_pr(md_text: str) -> str:
+def try_rm_junk_part_for_pr(lines: list[str]) -> list[str]:
     '''
         Try to remove the no-need part of press release. Handles monthly, quarterly or yearly press releases.
 
@@ -129,8 +145,9 @@ def try_rm_junk_part_for_pr(md_text: str) -> str:
         [Find the smallest index between 3 and 4]
 
         The head part is including or before the "| Tradeweb" or "| Tradeweb Markets" line.
+
+        Takes the lines of the markdown, and returns the kept lines for the following steps.
     '''
-    lines = md_text.splitlines()
 
     # The indexes tracks where to start removing the head and tail part
     head_rm_idx = None
@@ -138,42 +155,45 @@ def try_rm_junk_part_for_pr(md_text: str) -> str:
 
     # :::::: Start Removal Strategy :::::: #
 
-    for i in range(len(lines)):
-        line = lines[i]
+    for i, line in enumerate(lines):
+        line_lower = line.strip().lower()
 
         # Find the index to remove the head part
-        if head_rm_idx is None and any(pattern in line.strip().lower() for pattern in PR_M_MD_HEAD_RM_PATTERNS):
+        if head_rm_idx is None and PR_M_MD_HEAD_RM_RE.search(line_lower):
             head_rm_idx = i
 
         # Find the index to remove the tail section part 
         if min_tail_rm_idx is None:
-            line_regularized = line.replace('#', '').strip().lower()
-            if any(pattern == line_regularized for pattern in PR_M_MD_TAIL_SECTION_RM_PATTERNS) or \
-                any(pattern in line.strip().lower() for pattern in PR_M_MD_TAIL_RM_PATTERNS):
+            line_regularized = line_lower.replace('#', '').strip()
+            if line_regularized in PR_M_MD_TAIL_SECTION_RM_SET or \
+                PR_M_MD_TAIL_RM_RE.search(line_lower):
                     min_tail_rm_idx = i
 
-    # :::::: Preparing Output :::::: #
-
-    out = copy.deepcopy(lines)
+        # Both indexes are only taken from their first match, nothing left to find
+        if head_rm_idx is not None and min_tail_rm_idx is not None:
+            break
 
-    # Remove the tail part (MUST remove the TAIL before HEAD or running into index error!)
-    if min_tail_rm_idx is not None:
-        out = out[:min_tail_rm_idx]
+    # :::::: Preparing Output :::::: #
 
-    # Remove the head part
-    if head_rm_idx is not None:
-        out = out[head_rm_idx + 1:]
+    # Keep the part between the head and the tail (strings are immutable, slicing the lines needs no copy)
+    start = head_rm_idx + 1 if head_rm_idx is not None else 0
+    end = min_tail_rm_idx if min_tail_rm_idx is not None else len(lines)
 
-    # Remove the lines only consists of information in the PR_M_MD_LINES_TO_RM list
-    out = [line for line in out if line.strip().lower() not in PR_M_MD_LINES_TO_RM]
+    # In one pass, remove the empty lines and the lines only consists of information in the PR_M_MD_LINES_TO_RM list
+    return [
+        line for line in lines[start:end]
+        if (line_lower := line.strip().lower()) and line_lower not in PR_M_MD_LINES_TO_RM_SET
+    ]
 
-    # Remove empty lines
-    out = [line for line in out if line.strip().lower() != '']
 
-    return "\n".join(out)
+def is_parent_line_pr(line: str) -> bool:
+    '''
+        A line is a parent if it has no leading spaces or it starts with '**'.
+    '''
+    return not line.startswith(' ') or line.lstrip().startswith('**')
 
 
-def turn_md_into_blocks_pr(md_text: str) -> tuple[list[str], list[list[str]]]:
+def turn_md_into_blocks_pr(lines: list[str]) -> tuple[list[str], list[list[str]]]:
     '''
         Only for Tradeweb Press Release for now.
         Given list of lines in markdown, split them into different blocks.
@@ -193,42 +213,27 @@ def turn_md_into_blocks_pr(md_text: str) -> tuple[list[str], list[list[str]]]:
         2. A line starts with '**'.
 
     '''
-    def is_parent(line: str) -> bool:
-        return len(line) == len(line.lstrip(' ')) or line.strip().startswith('**')
-
-    # Split the md text into lines
-    lines = md_text.splitlines()
-
     # :::::: Identify Parents and Children :::::: #
 
-    # Walk to identify the starting of the block (As parent) and associate children lines of it.
+    # First pass finds where each block starts (As parent), the children are the lines in between.
     # Didn't use dict to avoid potential duplicate parent lines
-    parents = []
-    children_groups = []
+    # If a line starts with '**' or it's a line with no leading spaces, it's the starting of a new block
+    parent_idx = [i for i, line in enumerate(lines) if is_parent_line_pr(line)]
+    parents = [lines[i] for i in parent_idx]
 
-    # Handle edge case - if the article starts without parent line
-    if not is_parent(lines[0]):
-        current_parent = ''
-        parents.append(current_parent)
-        children_groups.append([])
-    else:
-        current_parent = None
+    # Second pass slices the children lines between two parents, the last block runs to the end
+    bounds = parent_idx[1:] + [len(lines)]
+    children_groups = [lines[start + 1:end] for start, end in zip(parent_idx, bounds)]
 
-    # Normal process
-    for i, line in enumerate(lines):
-
-        # If a line starts with '**' or it's a line with no leading spaces, it's the starting of a new block
-        if is_parent(line):
-            current_parent = line
-            parents.append(current_parent)
-            children_groups.append([])
-        else:
-            children_groups[-1].append(line)
+    # Handle edge case - if the article starts without parent line
+    if not parent_idx or parent_idx[0] != 0:
+        parents.insert(0, '')
+        children_groups.insert(0, lines[:parent_idx[0] if parent_idx else len(lines)])
 
     return (parents, children_groups)
 
 
-def split_md_to_chunks_pr(md_text: str, metadata: dict) -> str:
+def split_md_to_chunks_pr(lines: list[str], metadata: dict) -> list[str]:
     '''
         Try to separate the content into chunks, it's preparing for the content embedding process.
 
@@ -236,21 +241,18 @@ def split_md_to_chunks_pr(md_text: str, metadata: dict) -> str:
         If can't find the separate pattern, treat the time we find the next line indentation to detect subline.
 
         Args:
-            md_text: The markdown text to be split into chunks
+            lines: The lines of the markdown to be split into chunks
             meta_data: The meta data of the press release where this chunk belongs to
         Returns:
             A list of text, and each stands for a chunk
     '''
-    lines = md_text.splitlines()
-
     # :::::: Split into head and content section, they are handled differently :::::: #
 
-    # Find the index to separate the content
-    idx_to_separate = None
-    for i, line in enumerate(lines):
-        if any(pattern in line.strip().lower() for pattern in PR_M_MD_CONTENT_SEPARATE_PATTERN):
-            idx_to_separate = i
-            break
+    # Find the index to separate the content, stops at the first match
+    idx_to_separate = next(
+        (i for i, line in enumerate(lines) if PR_M_MD_CONTENT_SEPARATE_RE.search(line.strip())),
+        None
+    )
     
     # Split the article into head and content section
     if idx_to_separate is not None:
@@ -282,7 +284,7 @@ def split_md_to_chunks_pr(md_text: str, metadata: dict) -> str:
     if content_section is not None:
 
         # Turn the content section into blocks
-        parents, children_groups = turn_md_into_blocks_pr('\n'.join(content_section))
+        parents, children_groups = turn_md_into_blocks_pr(content_section)
         
         if metadata['report_type'] == "monthly":
             chunk_overlap_lines = PR_M_CHUNK_OVERLAP_LINES
@@ -292,8 +294,8 @@ def split_md_to_chunks_pr(md_text: str, metadata: dict) -> str:
             chunking_strategy = DEFAULT_CHUNKING_STRATEGY
 
         # Split the children into chunks
-        for i, children in enumerate(children_groups):
-            parent_tag = parents[i] + "\n"
+        for parent, children in zip(parents, children_groups):
+            parent_tag = parent + "\n"
             curr_chunks = chunk_utils.split_into_chunks(lines = children, 
                                                         max_token_count = PR_DEFAULT_TOKEN_MAX_FOR_EMBEDDING, 
                                                         model_name = PR_DEFAULT_EMBEDDING_MODEL, 
@@ -303,11 +305,10 @@ def split_md_to_chunks_pr(md_text: str, metadata: dict) -> str:
                                                         chunking_strategy = chunking_strategy)
             chunks_out.extend(curr_chunks)
 
-    print("="*100)
-    for chunk in chunks_out:
-        print("="*100)
-        print(chunk)
-        
+    # Dump the chunks for debugging, only built when debug logging is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Chunks of the press release:\n%s", "\n".join(f"{'=' * 100}\n{chunk}" for chunk in chunks_out))
+
     return chunks_out
 
 
@@ -335,14 +336,14 @@ def add_signature_to_chunks_pr(chunks, metadata: dict):
     # Create unified signature
     signature = f"[report={report_name} | type={report_type} | date={date_sig}]"
 
-    # Prepend signature to chunks
-    return [f"{signature}\n{chunk}" for chunk in chunks]
+    # Prepend signature to chunks, the prefix is the same for every chunk
+    prefix = f"{signature}\n"
+    return [prefix + chunk for chunk in chunks]
 
 
-def upload_pr_chunks_to_vectorstore(chunks, metadata: dict):
+def make_pr_chunk_records(chunks, metadata: dict) -> list[dict]:
     '''
-        Upload the press release chunks to the vector store.
-        The embedding is done automatically by Pinecone.
+        Create the vector store records of the press release chunks.
     '''
     # Get the metadata of the PR
     url = metadata["url"]
@@ -352,13 +353,17 @@ def upload_pr_chunks_to_vectorstore(chunks, metadata: dict):
     month = metadata.get("month")
     quarter = metadata.get("quarter")
 
+    # The ID hash of every chunk starts with the same prefix, so hash it once and copy the state per chunk
+    id_prefix_hasher = hashlib.sha256(f"{url}-{report_name}-".encode())
+
     # Created the records for upserting
     records_to_upsert = []
     for i, chunk in enumerate(chunks):
 
-        # deterministic ID as you had
-        id_str = f"{url}-{report_name}-{chunk}"
-        id_hash = hashlib.sha256(id_str.encode()).hexdigest()
+        # deterministic ID as you had, same as hashing f"{url}-{report_name}-{chunk}"
+        id_hasher = id_prefix_hasher.copy()
+        id_hasher.update(chunk.encode())
+        id_hash = id_hasher.hexdigest()
 
         metadata_chunk = {
             "url": str(url),
@@ -377,69 +382,119 @@ def upload_pr_chunks_to_vectorstore(chunks, metadata: dict):
             "metadata": metadata_chunk
         })
 
-        # upsert_records is the operation which lets Pinecone embed automatically
-        # adjust batch size if needed
-        batch_size = 100
-        for j in range(0, len(records_to_upsert), batch_size):
-            batch = records_to_upsert[j : j + batch_size]
-            pinecone_store.upsert_records(records=batch)
+    return records_to_upsert
 
 
-async def ingest_pr_md_file(file_path: str) -> bool:
+async def async_upsert_pr_records_to_vectorstore(records_to_upsert: list[dict], force: bool = False):
     '''
-        Parse the press release and upload to vector database.
+        Upsert the press release records to the vector store in batches, without blocking the event loop.
+        The embedding is done automatically by Pinecone.
+        Records already upserted with the same content are skipped, unless force is True.
+    '''
+    if not records_to_upsert:
+        return
+
+    # upsert_records is the operation which lets Pinecone embed automatically.
+    # All records are collected first, the store sends them in concurrent batches (adjust PR_UPSERT_BATCH_SIZE if needed)
+    await pinecone_store.async_upsert_records(records=records_to_upsert,
+                                              batch_size=PR_UPSERT_BATCH_SIZE,
+                                              skip_unchanged=not force)
+
+
+def get_pr_md_chunks(file_path: str) -> tuple[list[str], dict]:
+    '''
+        Get the chunks and metadata of a press release MD file.
+        The result is cached by the modified time of the file and its meta file,
+        so an unchanged press release isn't cleaned up and chunked again.
+    '''
+    meta_file_path = utils.get_meta_file_path(file_path)
+    meta_mtime = os.stat(meta_file_path).st_mtime_ns if os.path.exists(meta_file_path) else 0
+    return _get_pr_md_chunks_cached(file_path, os.stat(file_path).st_mtime_ns, meta_mtime)
+
+
+@lru_cache(maxsize=128)
+def _get_pr_md_chunks_cached(file_path: str, mtime: int, meta_mtime: int) -> tuple[list[str], dict]:
+    '''
+        Clean up and chunk a press release MD file. The mtimes are only the cache key.
     '''
-    logger.info(f"Ingesting press release MD file: {file_path}")
-    
     # Get the raw markdown and meta data
-    md_raw = utils.read_file(file_path)
+    md_lines = utils.read_file_lines(file_path)
     metadata = utils.get_meta_file(file_path)
 
     # Clean up the PR markdown file
-    md_cleaned = try_rm_junk_part_for_pr(md_raw)
+    md_lines = try_rm_junk_part_for_pr(md_lines)
 
     # Split the PR markdown file into chunks
-    md_chunks = split_md_to_chunks_pr(md_cleaned, metadata)
+    md_chunks = split_md_to_chunks_pr(md_lines, metadata)
 
     # Add signature to the chunks
     if PR_ADD_SIGNATURE_TO_CHUNKS:
         md_chunks = add_signature_to_chunks_pr(md_chunks, metadata)
 
+    return md_chunks, metadata
+
+
+async def ingest_pr_md_file(file_path: str, force: bool = False) -> bool:
+    '''
+        Parse the press release and upload to vector database.
+        Use force=True to re-upload every chunk, e.g. after the index was wiped outside of this app.
+    '''
+    logger.info(f"Ingesting press release MD file: {file_path}")
+    
+    # Clean up and chunk the PR markdown file, skipped if the file and its meta file haven't changed
+    md_chunks, metadata = get_pr_md_chunks(file_path)
+
     # Embed and upload to DB
-    upload_pr_chunks_to_vectorstore(md_chunks, metadata)
+    await async_upsert_pr_records_to_vectorstore(make_pr_chunk_records(md_chunks, metadata), force=force)
 
     return True
 
 
-async def ingest_many_pr_md_files(file_paths: list[str]) -> bool:
+async def ingest_many_pr_md_files(file_paths: list[str], force: bool = False) -> bool:
     '''
-        Parse many press releases concurrently.
+        Parse many press releases, and upload the chunks of all of them together.
+        Batches are filled across files, so small press releases don't each send a partial batch.
+        Use force=True to re-upload every chunk, e.g. after the index was wiped outside of this app.
     '''
-    tasks = [ingest_pr_md_file(file_path) for file_path in file_paths]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    return all(results)
+    all_ok = True
+    records_to_upsert = []
+    for file_path in file_paths:
+        logger.info(f"Ingesting press release MD file: {file_path}")
+        try:
+            md_chunks, metadata = get_pr_md_chunks(file_path)
+            records_to_upsert.extend(make_pr_chunk_records(md_chunks, metadata))
+        except Exception as e:
+            logger.error(f"Error parsing press release MD file {file_path}: {e}", exc_info=True)
+            all_ok = False
+
+    # Embed and upload to DB
+    await async_upsert_pr_records_to_vectorstore(records_to_upsert, force=force)
 
+    return all_ok
 
-async def ingest_all_pr_md_in_storage() -> bool:
+
+async def ingest_all_pr_md_in_storage(force: bool = False) -> bool:
     """
     Parse all press releases in the storage.
+    Use force=True to re-upload every chunk, e.g. after the index was wiped outside of this app.
     Returns True if parsing ran, False if nothing to parse.
     """
     if not os.path.exists(PR_FILES_FOLDER_PATH_STR):
         logger.warning(f"Storage folder not found: {PR_FILES_FOLDER_PATH_STR}")
         return False
 
-    file_paths = [
-        os.path.join(PR_FILES_FOLDER_PATH_STR, file_name)
-        for file_name in os.listdir(PR_FILES_FOLDER_PATH_STR)
-        if file_name.endswith(".md")
-    ]
+    # scandir gives the full path and the entry type along with the name, no join or extra stat needed
+    with os.scandir(PR_FILES_FOLDER_PATH_STR) as entries:
+        file_paths = [
+            entry.path for entry in entries
+            if entry.name.endswith(".md") and entry.is_file()
+        ]
 
     if not file_paths:
         logger.info("No .md press release files found in storage.")
         return False
 
-    await ingest_many_pr_md_files(file_paths)
+    await ingest_many_pr_md_files(file_paths, force=force)
     return True
 
 
@@ -448,61 +503,22 @@ def get_report_type(url: str) -> str:
         Check if the URL is a monthly, quarterly or yearly report.
         Return the type of the report.
     '''
-    logger.info(f"Checking if the URL is a monthly, quarterly or yearly report: {url}")
+    logger.info("Checking if the URL is a monthly, quarterly or yearly report: %s", url)
 
     # If it's not Tradeweb domain, return None
     if not url.startswith(PR_URL_DOMAIN):
-        logger.info(f"The URL is not a Tradeweb domain: {url}")
+        logger.info("The URL is not a Tradeweb domain: %s", url)
         return None
 
     # If it's Tradeweb domain, do the check
-    if is_monthly_report(url):
-        return "monthly"
-    elif is_quarterly_report(url):
-        return "quarterly"
-    elif is_yearly_report(url):
-        return "yearly"
+    match = REPORT_TYPE_RE.search(utils.get_url_last_part(url))
+    if match:
+        return match.lastgroup
     else:
-        logger.info(f"The URL is not a monthly, quarterly or yearly report: {url}")
+        logger.info("The URL is not a monthly, quarterly or yearly report: %s", url)
         return None
 
 
-def is_monthly_report(url: str) -> bool:
-    '''
-        Check if the URL is a monthly report.
-        The URL last part like "tradeweb-reports-august-2025-..."
-    '''
-    # Get the URL last part
-    url_last_part = utils.get_url_last_part(url)
-
-    pattern = re.compile(MONTHLY_PR_PATTERN, re.IGNORECASE)
-    return bool(pattern.search(url_last_part))
-
-
-def is_quarterly_report(url: str) -> bool:
-    '''
-        Check if the URL is a quarterly report.
-        The URL last part like "tradeweb-reports-first-quarter-2025-..."
-    '''
-    # Get the URL last part
-    url_last_part = utils.get_url_last_part(url)
-
-    pattern = re.compile(QUARTERLY_PR_PATTERN, re.IGNORECASE)
-    return bool(pattern.search(url_last_part))
-
-
-def is_yearly_report(url: str) -> bool:
-    '''
-        Check if the URL is a yearly report.
-        The URL last part like "tradeweb-reports-fourth-quarter-and-full-year-2025-..."
-    '''
-    # Get the URL last part
-    url_last_part = utils.get_url_last_part(url)
-
-    pattern = re.compile(YEARLY_PR_PATTERN, re.IGNORECASE)
-    return bool(pattern.search(url_last_part))
-
-
 def get_report_date(url: str, report_type: str) -> str:
     '''
         Get the report date from the URL.
@@ -512,28 +528,28 @@ def get_report_date(url: str, report_type: str) -> str:
         Returns:
             The report date
     '''
-    logger.info(f"Getting the report date from the URL: {url} for report type: {report_type}")
+    logger.info("Getting the report date from the URL: %s for report type: %s", url, report_type)
 
-    url_last_part = utils.get_url_last_part(url)
+    # Split once, each report type picks its parts by position
+    url_parts = utils.get_url_last_part(url).split("-")
 
     if report_type is None:
         out = None
 
     elif report_type == "monthly":
         # Extract the year and month
-        year = url_last_part.split("-")[3]
-        month = url_last_part.split("-")[2]
+        year = url_parts[3]
 
         # Convert the month to the format MM
-        month = datetime.strptime(month, "%B").strftime("%m")
+        month = PR_MONTH_MAPPING[url_parts[2].lower()]
 
         # Format the report date
         out = f"{year}_{month}"
 
     elif report_type == "quarterly":
         # Extract the year and quarter
-        year = url_last_part.split("-")[4]
-        quarter_str = url_last_part.split("-")[2]
+        year = url_parts[4]
+        quarter_str = url_parts[2]
 
         # Convert the quarter to the format Q1, quarter is current in format "first", "second", "third", "fourth"
         quarter = PR_QUARTER_MAPPING[quarter_str]
@@ -543,7 +559,7 @@ def get_report_date(url: str, report_type: str) -> str:
 
     elif report_type == "yearly":
         # Extract the year
-        year = url_last_part.split("-")[7]
+        year = url_parts[7]
         
         # Format the report date
         out = f"{year}"
@@ -551,6 +567,6 @@ def get_report_date(url: str, report_type: str) -> str:
     else:
         raise ValueError(f"Invalid report type: {report_type}")
     
-    logger.info(f"The report date is: {out}")
+    logger.info("The report date is: %s", out)
     return out
 
@@ -10,6 +10,7 @@ from services.constants import *
 import json
 import os
 from pathlib import Path
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +20,7 @@ def enforce_schema(df, schema, strict=True):
 
       Args:
           df: DataFrame to enforce schema on
-          schema: dict of {column: dtype}
+          schema: mapping of {column: dtype}
           strict: if True, raise error if columns are missing
 
       Returns:
@@ -41,14 +42,13 @@ def enforce_schema(df, schema, strict=True):
     if extra:
         logger.warning(f"Unexpected extra columns: {extra}")
 
-    # Cast columns
-    for col, dtype in schema.items():
-        if col in df.columns:
-            try:
-                df[col] = df[col].astype(dtype)
-            except Exception as e:
-                logger.error(f"Could not cast column {col} to {dtype}: {e}")
-                raise
+    # Cast all present columns in one go
+    dtypes = {col: dtype for col, dtype in schema.items() if col in df.columns}
+    try:
+        df = df.astype(dtypes)
+    except Exception as e:
+        logger.error(f"Could not cast columns to {dtypes}: {e}")
+        raise
     return df
 
 def write_file(text: str, file_path: str):
@@ -66,7 +66,14 @@ def read_file(file_path: str) -> str:
     '''
     with open(file_path, 'r') as f:
         return f.read()
-    return text
+
+def read_file_lines(file_path: str) -> list[str]:
+    '''
+      Read the lines of a text file, without the line breaks.
+      The file is read line by line, so the whole text is never held as one string.
+    '''
+    with open(file_path, 'r') as f:
+        return [line.rstrip('\n') for line in f]
 
 def save_meta_file(meta_data: dict, org_file_dir: str, org_file_name: str):
     '''
@@ -84,13 +91,20 @@ def save_meta_file(meta_data: dict, org_file_dir: str, org_file_name: str):
     with open(f'{org_file_dir}/{org_file_name}-meta.json', 'w') as f:
         json.dump(meta_data, f)
 
+def get_meta_file_path(file_path: str) -> str:
+    """
+    Get the path of the metadata JSON corresponding to a file path.
+    Example: myfile.md -> myfile-meta.json
+    """
+    base = Path(file_path).with_suffix("")  # drop the extension
+    return f"{base}-meta.json"
+
 def get_meta_file(file_path: str) -> dict:
     """
     Get the metadata JSON corresponding to a file path.
     Example: myfile.md -> myfile-meta.json
     """
-    base = Path(file_path).with_suffix("")  # drop the extension
-    meta_file_path = f"{base}-meta.json"
+    meta_file_path = get_meta_file_path(file_path)
 
     try:
         with open(meta_file_path, "r", encoding="utf-8") as f:
@@ -110,18 +124,27 @@ def regularize_url(url: str) -> str:
         url = url[:-1]
     return url
 
+@lru_cache(maxsize=256)
 def get_url_last_part(url: str) -> str:
     '''
       Get the last part of the URL.
+      Cached, as the report type and date of the same URL are both read from it.
     '''
     url = regularize_url(url)
     return url.split("/")[-1]
 
+@lru_cache(maxsize=8)
+def get_token_encoding(model_name: str = DEFAULT_EMBEDDING_MODEL) -> tiktoken.Encoding:
+    '''
+      Get the tokenizer encoding of the model, looked up once per model.
+    '''
+    return tiktoken.encoding_for_model(model_name)
+
 def get_token_count(text: str, model_name: str = DEFAULT_EMBEDDING_MODEL) -> int:
     '''
       Get the token count of the text.
     '''
-    encoding = tiktoken.encoding_for_model(model_name)
+    encoding = get_token_encoding(model_name)
     tokens = encoding.encode(text)
     
     return len(tokens)
\ No newline at end of file
@@ -1,13 +1,17 @@
 import os
-from typing import List, Dict, Any, Optional
+import json
+import hashlib
+import sqlite3
+from contextlib import closing
+from typing import List, Dict, Any, Optional, Iterator
 import logging
+import time
+import asyncio
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from pinecone import Pinecone, exceptions
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Logging is configured by the application, this module only logs to its own logger
 logger = logging.getLogger(__name__)
 
 
@@ -18,19 +22,278 @@ PINECONE_ENV = os.environ.get("PINECONE_ENV", "us-east1")  # or whichever region
 INDEX_NAME = os.environ.get("PINECONE_INDEX_NAME", "pr-index")
 PINECONE_NAMESPACE = os.environ.get("PINECONE_NAMESPACE", "tradeweb-namespace")
 
+# Max number of upsert requests in flight at once, also the size of the client's connection pool.
+# Kept small, as Pinecone rate limits (HTTP 429) bursts of upserts
+PINECONE_POOL_THREADS = 10
+
+# Retries of an upsert batch which was rate limited or hit a server error
+PINECONE_UPSERT_RETRIES = 5
+PINECONE_UPSERT_BACKOFF = 1.0         # seconds, doubled on each attempt
+PINECONE_UPSERT_MAX_WAIT = 30.0       # seconds
+
+# Pinecone rejects upsert requests over 2 MB, batches are kept under this estimate to leave room for the JSON encoding
+PINECONE_UPSERT_MAX_BATCH_BYTES = 1_800_000
+PINECONE_RECORD_OVERHEAD_BYTES = 512  # allowance for the id and metadata fields of a record
+
+# Local record of what was upserted, so unchanged records aren't sent (and embedded) again
+PINECONE_UPSERT_CACHE_PATH = os.environ.get("PINECONE_UPSERT_CACHE_PATH", "storage/cache/pinecone_upsert_cache.sqlite")
+
+# How long a cached search result is reused. The press releases are ingested from another process,
+# whose upserts can't clear this process's cache, so this bounds how stale a search can get.
+SEARCH_CACHE_TTL_SECONDS = 600
+
 # :::::: Setup :::::: #
 
-pc = Pinecone(api_key=PINECONE_API_KEY)
+# The client and index are created on first use, once per process. Keyed by the pid, so a forked
+# worker opens its own connection pool instead of reusing the sockets of its parent.
+
+@lru_cache(maxsize=None)
+def _get_pinecone_client(pid: int) -> Pinecone:
+    return Pinecone(api_key=PINECONE_API_KEY)
+
+@lru_cache(maxsize=None)
+def _get_index(pid: int):
+    return _get_pinecone_client(pid).Index(name=INDEX_NAME, pool_threads=PINECONE_POOL_THREADS)
+
+def get_pinecone_client() -> Pinecone:
+    """
+    Get the Pinecone client of the current process.
+    """
+    return _get_pinecone_client(os.getpid())
 
-index = pc.Index(name=INDEX_NAME)
+def get_index():
+    """
+    Get the index client of the current process.
+    """
+    return _get_index(os.getpid())
 
 # :::::: Functions :::::: #
 
+def _batches(
+    records: List[Dict[str, Any]],
+    batch_size: int,
+    max_bytes: int = PINECONE_UPSERT_MAX_BATCH_BYTES
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield lists of records, each with at most batch_size records and roughly max_bytes of payload.
+    The size of a record is estimated from its text plus a fixed allowance for the id and metadata,
+    which is cheaper than serializing every record to JSON.
+    """
+    batch = []
+    batch_bytes = 0
+    for record in records:
+        record_bytes = len(record["text"].encode("utf-8")) + PINECONE_RECORD_OVERHEAD_BYTES
+
+        # Close the batch before it goes over the byte limit
+        if batch and batch_bytes + record_bytes > max_bytes:
+            logger.debug(f"Upsert batch capped by size at {len(batch)} records, ~{batch_bytes} bytes")
+            yield batch
+            batch, batch_bytes = [], 0
+
+        batch.append(record)
+        batch_bytes += record_bytes
+
+        if len(batch) == batch_size:
+            yield batch
+            batch, batch_bytes = [], 0
+
+    if batch:
+        yield batch
+
+
+def _flatten_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Flatten the metadata of each record into the record, as upsert_records expects.
+    """
+    # Add metadata fields directly to record, built in one literal per record
+    return [
+        {"id": record["id"], "text": record["text"], **record.get("metadata", {})}
+        for record in records
+    ]
+
+
+def _record_hash(record: Dict[str, Any]) -> str:
+    """
+    Hash of the whole flattened record, so a change to the text or to any metadata field is caught.
+    """
+    return hashlib.sha256(json.dumps(record, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _connect_upsert_cache() -> sqlite3.Connection:
+    """
+    Open the upsert cache, creating it if needed.
+    """
+    os.makedirs(os.path.dirname(PINECONE_UPSERT_CACHE_PATH) or ".", exist_ok=True)
+    con = sqlite3.connect(PINECONE_UPSERT_CACHE_PATH)
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS upsert_cache (
+            index_name TEXT,
+            namespace TEXT,
+            id TEXT,
+            record_hash TEXT,
+            PRIMARY KEY (index_name, namespace, id)
+        )
+    """)
+    return con
+
+
+def _upsert_cache_rows(flattened_records: List[Dict[str, Any]]) -> List[tuple]:
+    """
+    The upsert cache rows of the records, written once they are upserted.
+    """
+    return [(INDEX_NAME, PINECONE_NAMESPACE, record["id"], _record_hash(record)) for record in flattened_records]
+
+
+def _filter_unchanged_records(
+    flattened_records: List[Dict[str, Any]],
+    rows: List[tuple]
+) -> tuple[List[Dict[str, Any]], List[tuple]]:
+    """
+    Drop the records which were already upserted with the same content.
+
+    The upsert cache is trusted as the record of what the index holds, it is never checked against the index.
+    If the index or namespace was wiped outside of confirm_and_delete_all_records (e.g. in the Pinecone console,
+    or the index was recreated), reset the cache by deleting the PINECONE_UPSERT_CACHE_PATH file,
+    or upsert with skip_unchanged=False.
+
+    Returns:
+        The records to send, and their upsert cache rows
+    """
+    try:
+        with closing(_connect_upsert_cache()) as con:
+            cached = dict(con.execute(
+                "SELECT id, record_hash FROM upsert_cache WHERE index_name = ? AND namespace = ?",
+                (INDEX_NAME, PINECONE_NAMESPACE)
+            ).fetchall())
+    except sqlite3.Error as e:
+        # The cache only saves work, never fail the upsert because of it
+        logger.warning(f"Could not read the upsert cache, sending all records: {e}")
+        return flattened_records, rows
+
+    keep = [cached.get(row[2]) != row[3] for row in rows]
+    skipped = len(keep) - sum(keep)
+    if skipped and skipped == len(keep):
+        # Nothing is sent at all, make it visible in case the index lost the records the cache lists
+        logger.warning(f"All {skipped} records are unchanged according to the upsert cache, nothing is upserted to '{INDEX_NAME}'. "
+                       f"If the index was wiped, delete {PINECONE_UPSERT_CACHE_PATH} or upsert with skip_unchanged=False")
+    elif skipped:
+        logger.info(f"Skipped {skipped} unchanged records already upserted to '{INDEX_NAME}'")
+
+    return (
+        [record for record, k in zip(flattened_records, keep) if k],
+        [row for row, k in zip(rows, keep) if k]
+    )
+
+
+def _remember_upserted_records(rows: List[tuple]) -> None:
+    """
+    Record the upserted records in the upsert cache, in one transaction.
+    """
+    if not rows:
+        return
+    try:
+        with closing(_connect_upsert_cache()) as con, con:
+            con.executemany("INSERT OR REPLACE INTO upsert_cache VALUES (?, ?, ?, ?)", rows)
+    except sqlite3.Error as e:
+        logger.warning(f"Could not write the upsert cache: {e}")
+
+
+def _forget_upserted_records() -> None:
+    """
+    Clear the upsert cache of the namespace, after its records were deleted from the index.
+    """
+    try:
+        with closing(_connect_upsert_cache()) as con, con:
+            con.execute(
+                "DELETE FROM upsert_cache WHERE index_name = ? AND namespace = ?",
+                (INDEX_NAME, PINECONE_NAMESPACE)
+            )
+    except sqlite3.Error as e:
+        logger.warning(f"Could not clear the upsert cache: {e}")
+
+
+@lru_cache(maxsize=1)
+def _get_index_host() -> str:
+    """
+    Get the host of the index, the asyncio client is addressed by host instead of name.
+    """
+    return get_pinecone_client().describe_index(name=INDEX_NAME).host
+
+
+def _is_retryable(e: exceptions.PineconeApiException) -> bool:
+    """
+    Rate limited (429) and server errors (5xx) are worth retrying, other errors will fail again.
+    """
+    status = getattr(e, "status", None)
+    return status is None or status == 429 or status >= 500
+
+
+def _upsert_retry_wait(attempt: int, e: exceptions.PineconeApiException) -> Optional[float]:
+    """
+    Seconds to wait before retrying a failed upsert batch, with exponential backoff.
+    None if the batch shouldn't be retried, because the error will fail again or the retries are used up.
+    """
+    if attempt == PINECONE_UPSERT_RETRIES - 1 or not _is_retryable(e):
+        return None
+    wait_time = min(PINECONE_UPSERT_BACKOFF * (2 ** attempt), PINECONE_UPSERT_MAX_WAIT)
+    logger.warning(f"Pinecone upsert failed (attempt {attempt+1}/{PINECONE_UPSERT_RETRIES}), retrying in {wait_time:.1f} seconds: {e}")
+    return wait_time
+
+
+def _prepare_upsert(
+    records: List[Dict[str, Any]],
+    skip_unchanged: bool
+) -> tuple[List[Dict[str, Any]], List[tuple]]:
+    """
+    Flatten the records and drop the unchanged ones if skip_unchanged is True.
+
+    Returns:
+        The records to send, and their upsert cache rows
+    """
+    flattened_records = _flatten_records(records)
+    cache_rows = _upsert_cache_rows(flattened_records)
+    if skip_unchanged:
+        flattened_records, cache_rows = _filter_unchanged_records(flattened_records, cache_rows)
+    return flattened_records, cache_rows
+
+
+def _finish_upsert(flattened_records: List[Dict[str, Any]], cache_rows: List[tuple]) -> None:
+    """
+    Record the upserted records in the upsert cache, and drop the search results they may have made stale.
+    """
+    _remember_upserted_records(cache_rows)
+    clear_search_cache()
+
+    print(f"Auto-embedded & upserted {len(flattened_records)} chunks into '{INDEX_NAME}' in namespace '{PINECONE_NAMESPACE}'")
+
+
+def _upsert_batch_with_retry(batch: List[Dict[str, Any]]) -> None:
+    """
+    Upsert one batch of flattened records, retrying with exponential backoff.
+    """
+    for attempt in range(PINECONE_UPSERT_RETRIES):
+        try:
+            get_index().upsert_records(
+                namespace=PINECONE_NAMESPACE,
+                records=batch
+            )
+            return
+
+        except exceptions.PineconeApiException as e:
+            wait_time = _upsert_retry_wait(attempt, e)
+            if wait_time is None:
+                raise
+            time.sleep(wait_time)
+
+
 def upsert_records(
-    records: List[Dict[str, Any]]
+    records: List[Dict[str, Any]],
+    batch_size: int = 96,
+    pool_threads: int = PINECONE_POOL_THREADS,
+    skip_unchanged: bool = True
 ) -> None:
     """
-    Upsert a batch of PR chunk records into Pinecone.
+    Upsert PR chunk records into Pinecone.
 
     Each record should be a dict with keys:
       - id: str
@@ -39,39 +302,84 @@ def upsert_records(
 
     If USE_EXTERNAL_EMBEDDING is True, it will encode chunk_text externally and send vector + metadata.
     If False, uses integrated embedding (Pinecone embeds chunk_text automatically).
+
+    The records are sent in batches of batch_size. Each request waits for Pinecone to embed its batch,
+    so up to pool_threads batches are sent concurrently. Rate limited batches are retried with backoff.
+
+    Records already upserted with the same content are skipped, unless skip_unchanged is False.
     """
     try:
       
       # Integrated embedding: upsert_records
-      # Flatten metadata into main record
-      flattened_records = []
-      for record in records:
-          flattened_record = {
-              "id": record["id"],
-              "text": record["text"]
-          }
-          # Add metadata fields directly to record
-          if "metadata" in record:
-              flattened_record.update(record["metadata"])
-          flattened_records.append(flattened_record)
-
-      index.upsert_records(
-          namespace=PINECONE_NAMESPACE,
-          records=flattened_records
-      )
-
-      print(f"Auto-embedded & upserted {len(records)} chunks into '{INDEX_NAME}' in namespace '{PINECONE_NAMESPACE}'")
+      flattened_records, cache_rows = _prepare_upsert(records, skip_unchanged)
+      if not flattened_records:
+          return
+
+      # The pool caps the requests in flight, a batch which is rate limited backs off and retries.
+      # list() drains the results, so a batch which still fails raises here
+      with ThreadPoolExecutor(max_workers=pool_threads) as executor:
+          list(executor.map(_upsert_batch_with_retry, _batches(flattened_records, batch_size)))
+
+      _finish_upsert(flattened_records, cache_rows)
    
     except Exception as e:
       logger.exception(f"[upsert_records] Failed to upsert records: {records}")
       raise e
 
 
+async def async_upsert_records(
+    records: List[Dict[str, Any]],
+    batch_size: int = 96,
+    max_in_flight: int = PINECONE_POOL_THREADS,
+    skip_unchanged: bool = True
+) -> None:
+    """
+    Same as upsert_records, but the batches are sent with the asyncio client, so the caller's
+    event loop keeps running while Pinecone embeds them. Up to max_in_flight batches are sent concurrently.
+
+    The asyncio index holds an aiohttp session bound to the running loop, so it's opened per call
+    rather than kept at module level.
+    """
+    try:
+      flattened_records, cache_rows = _prepare_upsert(records, skip_unchanged)
+      if not flattened_records:
+          return
+
+      semaphore = asyncio.Semaphore(max_in_flight)
+
+      async with get_pinecone_client().IndexAsyncio(host=_get_index_host()) as async_index:
+
+          async def upsert_batch(batch: List[Dict[str, Any]]) -> None:
+              async with semaphore:
+                  for attempt in range(PINECONE_UPSERT_RETRIES):
+                      try:
+                          await async_index.upsert_records(
+                              namespace=PINECONE_NAMESPACE,
+                              records=batch
+                          )
+                          return
+
+                      except exceptions.PineconeApiException as e:
+                          wait_time = _upsert_retry_wait(attempt, e)
+                          if wait_time is None:
+                              raise
+                          await asyncio.sleep(wait_time)
+
+          await asyncio.gather(*(upsert_batch(batch) for batch in _batches(flattened_records, batch_size)))
+
+      _finish_upsert(flattened_records, cache_rows)
+
+    except Exception as e:
+      logger.exception(f"[async_upsert_records] Failed to upsert records: {records}")
+      raise e
+
+
 def search_content(
     query: str,
     top_k: int = 3,
     metadata: Optional[Dict[str, Any]] = None,
-    fields: Optional[List[str]] = None
+    fields: Optional[List[str]] = None,
+    use_cache: bool = True
 ) -> List[Dict[str, Any]]:
     """
     Search content using semantic similarity with optional metadata filtering.
@@ -85,6 +393,10 @@ def search_content(
                  - month: int (1-12)
                  - quarter: int (1-4)
                  - url: str
+        fields: Optional list of fields to return
+        use_cache: If True, a repeated search is answered from the in-process cache.
+                   The cache is cleared whenever records are upserted or deleted in this process,
+                   and the results expire after at most SEARCH_CACHE_TTL_SECONDS.
 
     Examples:
         # Simple search
@@ -102,8 +414,64 @@ def search_content(
     Returns:
         List of matches with id, score, text and metadata
     """
+    if not use_cache:
+        return _search_content(query, top_k, metadata, fields)
+
+    # metadata and fields aren't hashable, key the cache on their JSON and tuple forms
+    metadata_key = json.dumps(metadata, sort_keys=True, default=str) if metadata else ""
+    fields_key = tuple(fields) if fields else ()
+    # The time bucket is part of the key, so a result is not reused once its bucket has passed
+    ttl_bucket = int(time.monotonic() // SEARCH_CACHE_TTL_SECONDS)
+    return _search_content_cached(query, top_k, metadata_key, fields_key, ttl_bucket)
+
+
+def search_content_batch(
+    queries: List[str],
+    top_k: int = 3,
+    metadata: Optional[Dict[str, Any]] = None,
+    fields: Optional[List[str]] = None,
+    use_cache: bool = True
+) -> List[Any]:
+    """
+    Run several searches concurrently, the SDK has no batch search.
+    Takes the same arguments as search_content, and returns the responses in the order of the queries.
+    """
+    if not queries:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(PINECONE_POOL_THREADS, len(queries))) as executor:
+        return list(executor.map(
+            lambda query: search_content(query, top_k=top_k, metadata=metadata, fields=fields, use_cache=use_cache),
+            queries
+        ))
+
+
+@lru_cache(maxsize=512)
+def _search_content_cached(query: str, top_k: int, metadata_key: str, fields_key: tuple, ttl_bucket: int):
+    """
+    Cached search_content, failed searches raise and are not cached. The ttl_bucket is only the cache key.
+    """
+    return _search_content(query, top_k, json.loads(metadata_key) if metadata_key else None, list(fields_key))
+
+
+def clear_search_cache() -> None:
+    """
+    Drop the cached search results, as they may be stale after the index changed.
+    """
+    _search_content_cached.cache_clear()
+
+
+def _search_content(
+    query: str,
+    top_k: int,
+    metadata: Optional[Dict[str, Any]],
+    fields: Optional[List[str]]
+):
+    """
+    Run the search against Pinecone.
+    """
     try:
-        logger.info(f"Searching content with query: {query} and fields: {fields}")
+        logger.info("Searching content with query: %s and fields: %s", query, fields)
 
         # Construct the search query
         search_query = {
@@ -114,13 +482,13 @@ def search_content(
 
         # Execute search with integrated embedding
         if fields and len(fields) > 0:
-          resp = index.search(
+          resp = get_index().search(
               namespace = PINECONE_NAMESPACE,
               query = search_query,
               fields = fields
           )
         else:
-          resp = index.search(
+          resp = get_index().search(
               namespace = PINECONE_NAMESPACE,
               query = search_query
           )
@@ -128,7 +496,7 @@ def search_content(
         return resp
 
     except Exception as e:
-      logger.exception(f"[search_content] Failed to search for query: {query} and fields: {fields}")
+      logger.exception("[search_content] Failed to search for query: %s and fields: %s", query, fields)
       raise e
 
 
@@ -138,7 +506,14 @@ def confirm_and_delete_all_records():
     '''
 
     def delete_all_records():
-      index.delete(delete_all=True, namespace=PINECONE_NAMESPACE)
+      # Dropping the namespace is a single metadata operation, instead of deleting the records one by one.
+      # The namespace is created again by the next upsert.
+      try:
+          get_index().delete_namespace(namespace=PINECONE_NAMESPACE)
+      except exceptions.NotFoundException:
+          logger.info(f"Namespace '{PINECONE_NAMESPACE}' not found in '{INDEX_NAME}', nothing to delete")
+      _forget_upserted_records()
+      clear_search_cache()
       print(f"Deleted all records from '{INDEX_NAME}' in namespace '{PINECONE_NAMESPACE}'")
 
     prompt = f"Are you sure you want to delete *all* records from index '{INDEX_NAME}' in namespace '{PINECONE_NAMESPACE}'? Type **Yes** to confirm: "
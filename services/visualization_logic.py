@@ -1,33 +1,67 @@
 import pandas as pd
-from typing import List, Optional, Dict, Any, Set
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import time
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Set, FrozenSet
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from services.db import get_database
 from dataclasses import dataclass, field
 
+logger = logging.getLogger(__name__)
+
 # SQL queries as constants
+
+# The filter option queries have no ORDER BY, the options are kept in sets and the filters sort what they show
 HIERARCHY_QUERY = """
 SELECT DISTINCT
     asset_class,
     product_type,
-    product,
-    year,
-    month
-FROM mar_combined_m
-ORDER BY asset_class, product_type, product, year, month;
+    product
+FROM mar_combined_m;
+"""
+
+# Years and months are independent of the product hierarchy, so they are read on their own
+# instead of multiplying the hierarchy rows by every year and month
+DISTINCT_YEARS_QUERY = """
+SELECT DISTINCT year
+FROM mar_combined_m;
 """
 
-TREND_QUERY = """
+DISTINCT_MONTHS_QUERY = """
+SELECT DISTINCT month
+FROM mar_combined_m;
+"""
+
+DASHBOARD_QUERY = """
 WITH monthly_data AS (
-    -- Get all volumes regardless of filter to calculate MoM and YoY
+    -- Get all volumes regardless of filter to calculate MoM and YoY, pre-aggregated at ingestion
+    SELECT 
+        year_month,
+        year,
+        month,
+        total_volume,
+        total_adv
+    FROM {month_totals_source}
+),
+grouped_data AS (
+    -- Aggregate the filtered rows by month and by asset class in a single scan
     SELECT 
         year_month,
         year,
         month,
+        asset_class,
         SUM(volume) as total_volume,
-        SUM(adv) as total_adv
+        SUM(adv) as total_adv,
+        GROUPING(asset_class) as is_month_row
     FROM mar_combined_m
-    GROUP BY year_month, year, month
+    WHERE {where_clause}
+    GROUP BY GROUPING SETS ((year_month, year, month), (asset_class))
 ),
 filtered_data AS (
     -- Get filtered volumes for display
@@ -35,11 +69,10 @@ filtered_data AS (
         year_month,
         year,
         month,
-        SUM(volume) as total_volume,
-        SUM(adv) as total_adv
-    FROM mar_combined_m
-    WHERE {where_clause}
-    GROUP BY year_month, year, month
+        total_volume,
+        total_adv
+    FROM grouped_data
+    WHERE is_month_row = 1
 ),
 mom_yoy_calc AS (
     SELECT 
@@ -76,8 +109,11 @@ mom_yoy_calc AS (
         f.year = prev_year.year + 1 
         AND f.month = prev_year.month
 )
+-- Trend rows (one per month) followed by asset breakdown rows (one per asset class)
 SELECT 
+    'trend' as row_type,
     year_month,
+    NULL as asset_class,
     total_volume,
     total_adv,
     volume_mom_change,
@@ -85,25 +121,113 @@ SELECT
     adv_mom_change,
     adv_yoy_change
 FROM mom_yoy_calc
-ORDER BY year_month;
-"""
-
-ASSET_BREAKDOWN_QUERY = """
+UNION ALL
 SELECT 
+    'asset' as row_type,
+    NULL as year_month,
     asset_class,
-    SUM(volume) as total_volume
-FROM mar_combined_m
-WHERE {where_clause}
-GROUP BY asset_class
-ORDER BY total_volume DESC;
+    total_volume,
+    NULL as total_adv,
+    NULL as volume_mom_change,
+    NULL as volume_yoy_change,
+    NULL as adv_mom_change,
+    NULL as adv_yoy_change
+FROM grouped_data
+WHERE is_month_row = 0;
+"""
+
+# Checks whether the pre-aggregated month totals exist, the dashboard aggregates mar_combined_m itself until they do
+MONTH_TOTALS_TABLE_QUERY = """
+SELECT COUNT(*) AS TABLE_COUNT
+FROM information_schema.tables
+WHERE UPPER(table_name) = 'MAR_COMBINED_MONTH_TOTALS_M';
 """
 
-@dataclass
+MONTH_TOTALS_TABLE = "mar_combined_month_totals_m"
+
+MONTH_TOTALS_FALLBACK = """(
+        SELECT year_month, year, month, SUM(volume) AS total_volume, SUM(adv) AS total_adv
+        FROM mar_combined_m
+        GROUP BY year_month, year, month
+    ) AS month_totals"""
+
+TREND_COLUMNS = [
+    'YEAR_MONTH', 'TOTAL_VOLUME', 'TOTAL_ADV',
+    'VOLUME_MOM_CHANGE', 'VOLUME_YOY_CHANGE', 'ADV_MOM_CHANGE', 'ADV_YOY_CHANGE'
+]
+
+ASSET_BREAKDOWN_COLUMNS = ['ASSET_CLASS', 'TOTAL_VOLUME']
+
+# How long the filter options are reused before they are read from the database again
+FILTER_OPTIONS_TTL_SECONDS = 600
+
+# How many filter combinations keep their dashboard figure, per visualizer
+DASHBOARD_CACHE_SIZE = 64
+
+# How long a cached dashboard figure is reused. Also bounds how stale a session can get when
+# the data is updated from another process, which can't bump the data version below.
+DASHBOARD_CACHE_TTL_SECONDS = FILTER_OPTIONS_TTL_SECONDS
+
+# Bumped whenever the MAR data is known to have changed. Every session's cached dashboards
+# are tagged with the version they were built from, so all of them go stale together.
+_data_version: Dict[str, int] = {'version': 0}
+
+# The filter options only change when new MAR data is ingested, so they are shared
+# by every dashboard in the process. Holds the options, the time they were read and
+# whether the month totals rollup table exists.
+_filter_options_cache: Dict[str, Any] = {}
+
+def get_filter_options(db) -> Dict[str, Any]:
+    """Get the hierarchy rows, years and months for the filters, reusing them for FILTER_OPTIONS_TTL_SECONDS"""
+    cached = _filter_options_cache.get('options')
+    if cached is not None and time.monotonic() - _filter_options_cache['loaded_at'] < FILTER_OPTIONS_TTL_SECONDS:
+        return cached
+
+    # Read as Arrow, only the plain column values are needed so no DataFrame is built
+    hierarchy_data = db.fetch_arrow(HIERARCHY_QUERY)
+    options = {
+        'hierarchy': list(zip(
+            hierarchy_data.column('ASSET_CLASS').to_pylist(),
+            hierarchy_data.column('PRODUCT_TYPE').to_pylist(),
+            hierarchy_data.column('PRODUCT').to_pylist()
+        )),
+        'years': db.fetch_arrow(DISTINCT_YEARS_QUERY).column('YEAR').to_pylist(),
+        'months': db.fetch_arrow(DISTINCT_MONTHS_QUERY).column('MONTH').to_pylist(),
+    }
+    _filter_options_cache['options'] = options
+    _filter_options_cache['loaded_at'] = time.monotonic()
+    return options
+
+def get_month_totals_source(db) -> str:
+    """Get what the dashboard reads the month totals from, the rollup table once it exists"""
+    # Only a found table is remembered. The first MAR load may run in another process, which can't
+    # invalidate this cache, so a missing table is looked up again on every dashboard build until it shows up.
+    # The lookup is tiny next to the full-table aggregation of the fallback.
+    if not _filter_options_cache.get('has_month_totals'):
+        table_count = db.fetch_arrow(MONTH_TOTALS_TABLE_QUERY).column(0).to_pylist()[0]
+        # Warn on the first lookup only, not on every dashboard built while the table is missing
+        if not table_count and 'has_month_totals' not in _filter_options_cache:
+            logger.warning(f'{MONTH_TOTALS_TABLE} does not exist yet, aggregating mar_combined_m instead')
+        _filter_options_cache['has_month_totals'] = table_count > 0
+    return MONTH_TOTALS_TABLE if _filter_options_cache['has_month_totals'] else MONTH_TOTALS_FALLBACK
+
+def invalidate_filter_options_cache():
+    """Drop the cached filter options and mark every session's cached dashboards as stale"""
+    _filter_options_cache.clear()
+    _data_version['version'] += 1
+
+@dataclass(slots=True)
 class FilterState:
     """Class to maintain filter state"""
     # Reference mappings (immutable after initialization)
-    asset_class_to_product_types: Dict[str, Set[str]] = field(default_factory=dict)
-    product_type_to_products: Dict[str, Set[str]] = field(default_factory=dict)
+    asset_class_to_product_types: Dict[str, FrozenSet[str]] = field(default_factory=dict)
+    product_type_to_products: Dict[str, FrozenSet[str]] = field(default_factory=dict)
+    asset_class_to_products: Dict[str, FrozenSet[str]] = field(default_factory=dict)
+    
+    # Every item of each hierarchy level (immutable after initialization)
+    all_asset_classes: FrozenSet[str] = field(default_factory=frozenset)
+    all_product_types: FrozenSet[str] = field(default_factory=frozenset)
+    all_products: FrozenSet[str] = field(default_factory=frozenset)
     
     # Available items for selection
     available_asset_classes: Set[str] = field(default_factory=set)
@@ -128,32 +252,50 @@ class FilterStateManager:
     def __init__(self, db):
         self.db = db
         self.state = FilterState()
+        # Inside batch(), the child filters are recomputed once at the end instead of after every deselect.
+        # Holds the pending recomputation: 'asset_class', 'product_type' or None.
+        self._batching = False
+        self._pending_recompute: Optional[str] = None
         self._initialize_state()
     
     def _initialize_state(self):
         """Initialize filter state with all data"""
         # Fetch hierarchy data
-        hierarchy_data = self.db.fetchdf(HIERARCHY_QUERY)
+        filter_options = get_filter_options(self.db)
         
-        # Build immutable hierarchy mappings
-        for _, row in hierarchy_data.iterrows():
-            asset_class = row['ASSET_CLASS']
-            product_type = row['PRODUCT_TYPE']
-            product = row['PRODUCT']
-            
+        # Build hierarchy mappings
+        asset_class_to_product_types: Dict[str, Set[str]] = {}
+        product_type_to_products: Dict[str, Set[str]] = {}
+        for asset_class, product_type, product in filter_options['hierarchy']:
             # Build asset_class to product_types mapping
-            if asset_class not in self.state.asset_class_to_product_types:
-                self.state.asset_class_to_product_types[asset_class] = set()
-            self.state.asset_class_to_product_types[asset_class].add(product_type)
+            if asset_class not in asset_class_to_product_types:
+                asset_class_to_product_types[asset_class] = set()
+            asset_class_to_product_types[asset_class].add(product_type)
             
             # Build product_type to products mapping
-            if product_type not in self.state.product_type_to_products:
-                self.state.product_type_to_products[product_type] = set()
-            self.state.product_type_to_products[product_type].add(product)
+            if product_type not in product_type_to_products:
+                product_type_to_products[product_type] = set()
+            product_type_to_products[product_type].add(product)
+        
+        # Freeze the mappings, they never change after initialization
+        self.state.asset_class_to_product_types = {
+            k: frozenset(v) for k, v in asset_class_to_product_types.items()
+        }
+        self.state.product_type_to_products = {
+            k: frozenset(v) for k, v in product_type_to_products.items()
+        }
+        # All products under an asset class, through any of its product types
+        self.state.asset_class_to_products = {
+            ac: frozenset().union(*(self.state.product_type_to_products[pt] for pt in product_types))
+            for ac, product_types in self.state.asset_class_to_product_types.items()
+        }
+        self.state.all_asset_classes = frozenset(self.state.asset_class_to_product_types)
+        self.state.all_product_types = frozenset(self.state.product_type_to_products)
+        self.state.all_products = frozenset().union(*self.state.product_type_to_products.values())
         
         # Initialize time filters with reference sets that never change
-        self.state.available_years = set(hierarchy_data['YEAR'])
-        self.state.available_months = set(hierarchy_data['MONTH'])
+        self.state.available_years = set(filter_options['years'])
+        self.state.available_months = set(filter_options['months'])
         
         # Initialize selected sets with all items
         self.state.selected_years = self.state.available_years.copy()
@@ -162,23 +304,75 @@ class FilterStateManager:
         # Initialize with all items selected
         self.select_all()
     
+    @contextmanager
+    def batch(self):
+        """Defer recomputing the child filters of consecutive deselects until the end of the block"""
+        self._batching = True
+        try:
+            yield
+        finally:
+            self._batching = False
+            self._flush_pending_recompute()
+
+    def _request_recompute(self, level: str):
+        """Recompute the children of a level now, or at the end of the batch"""
+        if not self._batching:
+            self._recompute_children(level)
+            return
+        # Consecutive deselects of one level collapse into one recomputation, a different level
+        # has to see the result of the pending one first
+        if self._pending_recompute is not None and self._pending_recompute != level:
+            self._flush_pending_recompute()
+        self._pending_recompute = level
+
+    def _flush_pending_recompute(self):
+        """Run the pending recomputation, if any"""
+        if self._pending_recompute is not None:
+            level = self._pending_recompute
+            self._pending_recompute = None
+            self._recompute_children(level)
+
+    def _recompute_children(self, level: str):
+        """Update the available and selected children after items of a level were deselected"""
+        if level == 'asset_class':
+            # Get available product types from remaining asset classes
+            available_product_types = self._get_available_product_types_from_asset_classes(
+                self.state.selected_asset_classes
+            )
+            
+            # Get available products from these product types
+            available_products = self._get_available_products_from_product_types(
+                available_product_types
+            )
+            
+            # Update available and selected product types
+            self.state.available_product_types = available_product_types
+            self.state.selected_product_types.intersection_update(available_product_types)
+        else:
+            # Get available products from remaining selected product types
+            available_products = self._get_available_products_from_product_types(
+                self.state.selected_product_types
+            )
+        
+        # Update available and selected products
+        self.state.available_products = available_products
+        self.state.selected_products.intersection_update(available_products)
+
     def select_all(self):
         """Select all items in the hierarchy"""
+        self._flush_pending_recompute()
+        
         # Set all asset classes as available and selected
-        self.state.available_asset_classes = set(self.state.asset_class_to_product_types.keys())
-        self.state.selected_asset_classes = self.state.available_asset_classes.copy()
+        self.state.available_asset_classes = set(self.state.all_asset_classes)
+        self.state.selected_asset_classes = set(self.state.all_asset_classes)
         
         # Set all product types as available and selected
-        self.state.available_product_types = set()
-        for product_types in self.state.asset_class_to_product_types.values():
-            self.state.available_product_types.update(product_types)
-        self.state.selected_product_types = self.state.available_product_types.copy()
+        self.state.available_product_types = set(self.state.all_product_types)
+        self.state.selected_product_types = set(self.state.all_product_types)
         
         # Set all products as available and selected
-        self.state.available_products = set()
-        for products in self.state.product_type_to_products.values():
-            self.state.available_products.update(products)
-        self.state.selected_products = self.state.available_products.copy()
+        self.state.available_products = set(self.state.all_products)
+        self.state.selected_products = set(self.state.all_products)
     
     def _get_available_product_types_from_asset_classes(self, asset_classes: Set[str]) -> Set[str]:
         """Get all available product types from a set of asset classes"""
@@ -196,6 +390,8 @@ class FilterStateManager:
     
     def deselect_all_asset_classes(self):
         """Remove all asset classes and clear child filters"""
+        self._flush_pending_recompute()
+        
         # Clear asset class selected list (but keep available list unchanged)
         self.state.selected_asset_classes.clear()
         
@@ -208,6 +404,8 @@ class FilterStateManager:
 
     def deselect_all_product_types(self):
         """Remove all product types and clear child filters"""
+        self._flush_pending_recompute()
+        
         # Clear product type selected list (but keep available list unchanged)
         self.state.selected_product_types.clear()
         
@@ -226,14 +424,8 @@ class FilterStateManager:
             # Remove the product type
             self.state.selected_product_types.remove(product_type)
             
-            # Get available products from remaining selected product types
-            available_products = self._get_available_products_from_product_types(
-                self.state.selected_product_types
-            )
-            
-            # Update available and selected products
-            self.state.available_products = available_products
-            self.state.selected_products.intersection_update(available_products)
+            # Update the products from the remaining selected product types
+            self._request_recompute('product_type')
     
     def deselect_asset_class(self, asset_class: str):
         """Remove an asset class and update both product type and product lists"""
@@ -241,31 +433,18 @@ class FilterStateManager:
             # Remove the asset class
             self.state.selected_asset_classes.remove(asset_class)
             
-            # Get available product types from remaining asset classes
-            available_product_types = self._get_available_product_types_from_asset_classes(
-                self.state.selected_asset_classes
-            )
-            
-            # Get available products from these product types
-            available_products = self._get_available_products_from_product_types(
-                available_product_types
-            )
-            
-            # Update available and selected product types
-            self.state.available_product_types = available_product_types
-            self.state.selected_product_types.intersection_update(available_product_types)
-            
-            # Update available and selected products
-            self.state.available_products = available_products
-            self.state.selected_products.intersection_update(available_products)
+            # Update the product types and products from the remaining asset classes
+            self._request_recompute('asset_class')
     
     def select_product(self, product: str):
         """Add a product to selected list if it's available"""
+        self._flush_pending_recompute()
         if product in self.state.available_products:
             self.state.selected_products.add(product)
     
     def select_product_type(self, product_type: str):
         """Add a product type and its products if it's available"""
+        self._flush_pending_recompute()
         if product_type in self.state.available_product_types:
             self.state.selected_product_types.add(product_type)
             # Make its products available and selected
@@ -275,6 +454,7 @@ class FilterStateManager:
     
     def select_asset_class(self, asset_class: str):
         """Add an asset class and its children if it's available"""
+        self._flush_pending_recompute()
         if asset_class in self.state.available_asset_classes:
             self.state.selected_asset_classes.add(asset_class)
             # Get and select all child product types
@@ -282,10 +462,9 @@ class FilterStateManager:
             self.state.available_product_types.update(product_types)
             self.state.selected_product_types.update(product_types)
             # Get and select all grandchild products
-            for product_type in product_types:
-                products = self.state.product_type_to_products[product_type]
-                self.state.available_products.update(products)
-                self.state.selected_products.update(products)
+            products = self.state.asset_class_to_products[asset_class]
+            self.state.available_products.update(products)
+            self.state.selected_products.update(products)
 
 class DataFetcher:
     """Handles all database interactions"""
@@ -313,36 +492,43 @@ class DataFetcher:
             }
         }
 
+    def get_filter_key(self) -> tuple:
+        """Get a hashable key of the current selections, independent of the order items were selected in"""
+        state = self.filter_manager.state
+        return (
+            frozenset(state.selected_asset_classes),
+            frozenset(state.selected_products),
+            frozenset(state.selected_product_types),
+            frozenset(state.selected_years),
+            frozenset(state.selected_months),
+        )
+
     def build_where_clause(self) -> tuple[str, list]:
         """Build WHERE clause from current filter state"""
         conditions = []
         params = []
         state = self.filter_manager.state
         
-        if state.selected_asset_classes:
-            conditions.append(f"asset_class IN ({','.join(['%s'] * len(state.selected_asset_classes))})")
-            params.extend(state.selected_asset_classes)
-        
-        if state.selected_products:
-            conditions.append(f"product IN ({','.join(['%s'] * len(state.selected_products))})")
-            params.extend(state.selected_products)
-        
-        if state.selected_product_types:
-            conditions.append(f"product_type IN ({','.join(['%s'] * len(state.selected_product_types))})")
-            params.extend(state.selected_product_types)
-        
-        if state.selected_years:
-            conditions.append(f"year IN ({','.join(['%s'] * len(state.selected_years))})")
-            params.extend(state.selected_years)
-        
-        if state.selected_months:
-            conditions.append(f"month IN ({','.join(['%s'] * len(state.selected_months))})")
-            params.extend(state.selected_months)
+        filters = [
+            ('asset_class', state.selected_asset_classes, state.available_asset_classes),
+            ('product', state.selected_products, state.available_products),
+            ('product_type', state.selected_product_types, state.available_product_types),
+            ('year', state.selected_years, state.available_years),
+            ('month', state.selected_months, state.available_months),
+        ]
+        for column, selected, available in filters:
+            # No condition when every available item is selected, the parent filters already
+            # limit the rows to the available items
+            if not selected or selected == available:
+                continue
+            condition, param = self.db.in_condition(column, selected)
+            conditions.append(condition)
+            params.append(param)
         
         where_clause = " AND ".join(conditions) if conditions else "1=1"
         return where_clause, params
 
-    def get_dashboard_data(self) -> Optional[Dict[str, pd.DataFrame]]:
+    def get_dashboard_data(self) -> Optional[Dict[str, pa.Table]]:
         """Fetch dashboard data based on current filter state"""
         # Check if any required filter is empty
         state = self.filter_manager.state
@@ -354,14 +540,27 @@ class DataFetcher:
         where_clause, params = self.build_where_clause()
         params_tuple = tuple(params) if params else None
 
-        trend_data = self.db.fetchdf(
-            TREND_QUERY.format(where_clause=where_clause), 
+        # Trend and asset breakdown come back from one query, split them by row type.
+        # The result stays in Arrow, so the string columns are never turned into Python objects
+        dashboard_data = self.db.fetch_arrow(
+            DASHBOARD_QUERY.format(
+                where_clause=where_clause,
+                month_totals_source=get_month_totals_source(self.db)
+            ),
             params_tuple
         )
+        is_trend_row = pc.equal(dashboard_data['ROW_TYPE'], 'trend')
         
-        asset_data = self.db.fetchdf(
-            ASSET_BREAKDOWN_QUERY.format(where_clause=where_clause), 
-            params_tuple
+        trend_data = (
+            dashboard_data.filter(is_trend_row)
+            .select(TREND_COLUMNS)
+            .sort_by('YEAR_MONTH')
+        )
+        
+        asset_data = (
+            dashboard_data.filter(pc.invert(is_trend_row))
+            .select(ASSET_BREAKDOWN_COLUMNS)
+            .sort_by([('TOTAL_VOLUME', 'descending')])
         )
 
         return {
@@ -372,8 +571,9 @@ class DataFetcher:
 class ChartBuilder:
     """Handles all visualization logic"""
     @staticmethod
-    def create_dashboard_figure(trend_data: pd.DataFrame, asset_data: pd.DataFrame) -> go.Figure:
-        """Create the dashboard figure with all charts"""
+    @lru_cache(maxsize=1)
+    def _get_base_dashboard_figure() -> go.Figure:
+        """Build the dashboard skeleton once: subplots, empty traces, layout and axes"""
         fig = make_subplots(
             rows=2, cols=2,
             subplot_titles=('Monthly Trading Volume', 'Volume by Asset Class'),
@@ -386,8 +586,6 @@ class ChartBuilder:
         # Add monthly trend
         fig.add_trace(
             go.Bar(
-                x=trend_data['YEAR_MONTH'],
-                y=trend_data['TOTAL_VOLUME'],
                 name='Volume',
                 hovertemplate=(
                     'Month: %{x}<br><br>'
@@ -398,22 +596,13 @@ class ChartBuilder:
                     'MoM Change: %{customdata[3]}<br>'
                     'YoY Change: %{customdata[4]}'
                     '<extra></extra>'
-                ),
-                customdata=list(zip(
-                    [f"{x:.1f}%" if pd.notnull(x) else "NA" for x in trend_data['VOLUME_MOM_CHANGE']],
-                    [f"{x:.1f}%" if pd.notnull(x) else "NA" for x in trend_data['VOLUME_YOY_CHANGE']],
-                    trend_data['TOTAL_ADV'],
-                    [f"{x:.1f}%" if pd.notnull(x) else "NA" for x in trend_data['ADV_MOM_CHANGE']],
-                    [f"{x:.1f}%" if pd.notnull(x) else "NA" for x in trend_data['ADV_YOY_CHANGE']]
-                ))
+                )
             ),
             row=1, col=1
         )
-        
+
         fig.add_trace(
             go.Scatter(
-                x=trend_data['YEAR_MONTH'],
-                y=trend_data['TOTAL_ADV'],
                 name='ADV',
                 line=dict(color='red'),
                 hovertemplate='<extra></extra>'  # Hide duplicate hover info
@@ -424,8 +613,6 @@ class ChartBuilder:
         # Add asset class breakdown
         fig.add_trace(
             go.Pie(
-                labels=asset_data['ASSET_CLASS'],
-                values=asset_data['TOTAL_VOLUME'],
                 name='Asset Classes',
                 hovertemplate='Asset Class: %{label}<br>Volume: %{value:,.0f}<extra></extra>'
             ),
@@ -446,11 +633,54 @@ class ChartBuilder:
         
         return fig
 
+    @staticmethod
+    def _to_float_array(column: pa.ChunkedArray) -> np.ndarray:
+        """Get a numeric column as a float64 NumPy array, nulls become NaN"""
+        return pc.cast(column, pa.float64()).to_numpy()
+
+    @staticmethod
+    def create_dashboard_figure(trend_data: pa.Table, asset_data: pa.Table) -> go.Figure:
+        """Create the dashboard figure with all charts"""
+        # Copy the prebuilt skeleton, only the trace data changes between renders
+        fig = go.Figure(ChartBuilder._get_base_dashboard_figure())
+        volume_trace, adv_trace, asset_trace = fig.data
+        
+        # Pull the columns out once, the labels as plain lists and the numbers as float arrays,
+        # which Plotly validates and serializes as a whole instead of value by value
+        year_months = trend_data.column('YEAR_MONTH').to_pylist()
+        total_volume = ChartBuilder._to_float_array(trend_data.column('TOTAL_VOLUME'))
+        total_adv = ChartBuilder._to_float_array(trend_data.column('TOTAL_ADV'))
+
+        # Fill monthly trend
+        volume_trace.update(
+            x=year_months,
+            y=total_volume,
+            customdata=list(zip(
+                [f"{x:.1f}%" if pd.notnull(x) else "NA" for x in trend_data.column('VOLUME_MOM_CHANGE').to_pylist()],
+                [f"{x:.1f}%" if pd.notnull(x) else "NA" for x in trend_data.column('VOLUME_YOY_CHANGE').to_pylist()],
+                total_adv,
+                [f"{x:.1f}%" if pd.notnull(x) else "NA" for x in trend_data.column('ADV_MOM_CHANGE').to_pylist()],
+                [f"{x:.1f}%" if pd.notnull(x) else "NA" for x in trend_data.column('ADV_YOY_CHANGE').to_pylist()]
+            ))
+        )
+        adv_trace.update(x=year_months, y=total_adv)
+        
+        # Fill asset class breakdown
+        asset_trace.update(
+            labels=asset_data.column('ASSET_CLASS').to_pylist(),
+            values=ChartBuilder._to_float_array(asset_data.column('TOTAL_VOLUME'))
+        )
+        
+        return fig
+
 class VolumeVisualizer:
     """Main interface for volume visualization"""
     def __init__(self):
         self.data_fetcher = DataFetcher()
         self.chart_builder = ChartBuilder()
+        # Dashboard data and figure per filter key, least recently used first.
+        # Each entry holds the data version and time it was built from, and the dashboard itself.
+        self._dashboard_cache: OrderedDict = OrderedDict()
 
     def get_filter_state(self) -> Dict[str, Dict[str, Set[Any]]]:
         """Get current filter state"""
@@ -486,6 +716,10 @@ class VolumeVisualizer:
         elif filter_type == 'product_type':
             manager.deselect_product_type(value)
 
+    def batch(self):
+        """Group several select/deselect calls, the child filters are recomputed once at the end"""
+        return self.data_fetcher.filter_manager.batch()
+
     def update_time_filters(self, years: Optional[Set[int]] = None, months: Optional[Set[int]] = None):
         """Update year and month filters"""
         if years is not None:
@@ -493,12 +727,34 @@ class VolumeVisualizer:
         if months is not None:
             self.data_fetcher.filter_manager.state.selected_months = months
 
+    def invalidate_filter_cache(self):
+        """Drop the cached filter options, e.g. after new data has been ingested"""
+        invalidate_filter_options_cache()
+
+    def invalidate_dashboard_cache(self):
+        """Drop the cached dashboard figures, e.g. after new data has been ingested"""
+        self._dashboard_cache.clear()
+
     def reinitialize(self):
         """Reinitialize the data fetcher to refresh data from database"""
+        self.invalidate_filter_cache()
+        self.invalidate_dashboard_cache()
         self.data_fetcher = DataFetcher()
         
     def get_dashboard_data(self) -> Dict[str, Any]:
         """Get dashboard data and create visualization"""
+        # Reuse the figure if these filters were rendered before
+        filter_key = self.data_fetcher.get_filter_key()
+        cached = self._dashboard_cache.get(filter_key)
+        if cached is not None:
+            data_version, built_at, dashboard = cached
+            if (data_version == _data_version['version']
+                    and time.monotonic() - built_at < DASHBOARD_CACHE_TTL_SECONDS):
+                self._dashboard_cache.move_to_end(filter_key)
+                return {**dashboard, 'filter_state': self.get_filter_state()}
+            # Built from older data, drop it
+            del self._dashboard_cache[filter_key]
+
         data = self.data_fetcher.get_dashboard_data()
         
         # If any required filter is empty, return only filter state
@@ -516,9 +772,13 @@ class VolumeVisualizer:
             data['asset_data']
         )
         
-        return {
+        dashboard = {
             'figure': figure,
             'trend_data': data['trend_data'],
             'asset_data': data['asset_data'],
-            'filter_state': self.get_filter_state()
-        }
\ No newline at end of file
+        }
+        self._dashboard_cache[filter_key] = (_data_version['version'], time.monotonic(), dashboard)
+        if len(self._dashboard_cache) > DASHBOARD_CACHE_SIZE:
+            self._dashboard_cache.popitem(last=False)
+        
+        return {**dashboard, 'filter_state': self.get_filter_state()}
\ No newline at end of file
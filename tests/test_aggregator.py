@@ -0,0 +1,32 @@
+import os
+
+# The OpenAI client is created when the module is imported, it only needs a key to exist
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from services.ai_workflow.agents.aggregator import _get_partial_answer
+
+
+def test_partial_answer_not_started():
+    assert _get_partial_answer('') is None
+    assert _get_partial_answer('{"confidence": 0.9, "ans') is None
+
+
+def test_partial_answer_streaming():
+    assert _get_partial_answer('{"answer": "') == ''
+    assert _get_partial_answer('{"answer": "Total volume was') == 'Total volume was'
+
+
+def test_partial_answer_complete():
+    arguments = '{"answer": "Done.", "citations": [{"source": "MAR", "reference": "x"}]}'
+    assert _get_partial_answer(arguments) == 'Done.'
+
+
+def test_partial_answer_escapes():
+    assert _get_partial_answer(r'{"answer": "Line 1\nSaid \"hi\" \\ ok", "confidence": 1}') == 'Line 1\nSaid "hi" \\ ok'
+    assert _get_partial_answer(r'{"answer": "café') == 'café'
+
+
+def test_partial_answer_trims_incomplete_escape():
+    assert _get_partial_answer('{"answer": "Up 5%\\') == 'Up 5%'
+    assert _get_partial_answer('{"answer": "caf\\u00') == 'caf'
+    assert _get_partial_answer('{"answer": "caf\\u00e') == 'caf'